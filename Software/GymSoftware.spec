@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[('third_party/adb/adb.exe', '.'), ('third_party/adb/AdbWinApi.dll', '.'), ('third_party/adb/AdbWinUsbApi.dll', '.')],
-    datas=[('assets', 'assets'), ('clientsManagement', 'clientsManagement'), ('entries_management', 'entries_management'), ('mainwindow', 'mainwindow'), ('membershipsInfo', 'membershipsInfo'), ('membershipsPlans', 'membershipsPlans')],
+    datas=[('assets', 'assets'), ('clientsManagement', 'clientsManagement'), ('database', 'database'), ('entries_management', 'entries_management'), ('mainwindow', 'mainwindow'), ('membershipsInfo', 'membershipsInfo'), ('membershipsPlans', 'membershipsPlans')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
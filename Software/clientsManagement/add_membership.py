@@ -4,9 +4,10 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QComboBox, QDateEdit,
     QDialogButtonBox, QMessageBox
 )
-from PyQt6.QtSql import QSqlQuery
 from dateutil.relativedelta import relativedelta
 
+from database.repository import repository_for
+
 
 class AddMembershipDialog(QDialog):
     """Dialog to choose membership plan and add to a client."""
@@ -16,6 +17,7 @@ class AddMembershipDialog(QDialog):
         self.resize(360, 160)
 
         self._db = db
+        self._repo = repository_for(db)
         self._client_id = client_id
 
         # Normal window buttons
@@ -48,21 +50,15 @@ class AddMembershipDialog(QDialog):
 
     def _load_plans(self):
         """Fill combo with (id, name, months, price_decimal)."""
-        q = QSqlQuery(self._db)
-        if not q.exec("SELECT id, name, months, price_decimal FROM membership_plans ORDER BY name"):
+        plans = self._repo.list_plans()
+        if plans is None:
             QMessageBox.critical(self, "DB Error", "Failed to load plans.")
             return
-        has_any = False
-        while q.next():
-            has_any = True
-            plan_id = q.value(0)
-            name = q.value(1)
-            months = q.value(2)
-            price = q.value(3)
-            label = f"{name} — {months} month(s) — {price}"
+        for plan in plans:
+            label = f"{plan.name} — {plan.months} month(s) — {plan.price_decimal}"
             # store all useful data as the item's userData
-            self.plan_combo.addItem(label, (plan_id, months, price))
-        if not has_any:
+            self.plan_combo.addItem(label, (plan.id, plan.months, plan.price_decimal))
+        if not plans:
             self.plan_combo.addItem("No plans found (create one first)", None)
             self.plan_combo.setEnabled(False)
 
@@ -75,21 +71,11 @@ class AddMembershipDialog(QDialog):
         start_dt = self.start_date.date().toPyDate()
         end_dt = start_dt + relativedelta(months=months)
 
-        q = QSqlQuery(self._db)
-        q.prepare("""
-            INSERT INTO memberships (client_id, plan_id, start_date, end_date, price_paid)
-            VALUES (?, ?, ?, ?, ?)
-        """)
-        q.addBindValue(self._client_id)
-        q.addBindValue(plan_id)
-        q.addBindValue(start_dt.isoformat())
-        q.addBindValue(end_dt.isoformat())
-        q.addBindValue(price)
-
-        if not q.exec():
-            from PyQt6.QtSql import QSqlError
-            err = q.lastError().text() if q.lastError() else "Unknown error"
-            QMessageBox.critical(self, "DB Error", f"Failed to add membership:\n{err}")
+        ok, err = self._repo.add_membership(
+            self._client_id, plan_id, start_dt.isoformat(), end_dt.isoformat(), price
+        )
+        if not ok:
+            QMessageBox.critical(self, "DB Error", f"Failed to add membership:\n{err or 'Unknown error'}")
             return
 
         self.accept()
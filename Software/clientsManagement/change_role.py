@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QComboBox, QDialogButtonBox, QMessageBox
 from PyQt6.QtCore import Qt
-from PyQt6.QtSql import QSqlQuery
+
+from database.repository import repository_for
 
 
 class ChangeRoleDialog(QDialog):
@@ -40,13 +41,9 @@ class ChangeRoleDialog(QDialog):
 
     def _on_ok(self):
         new_role = self.role_combo.currentText()
-        q = QSqlQuery(self._db)
-        q.prepare('UPDATE Client SET role = ? WHERE id = ?')
-        q.addBindValue(new_role)
-        q.addBindValue(self._client_id)
-
-        if not q.exec():
-            QMessageBox.critical(self, "Error", f"Failed to change role:\n{q.lastError().text()}")
+        ok, err = repository_for(self._db).set_client_role(self._client_id, new_role)
+        if not ok:
+            QMessageBox.critical(self, "Error", f"Failed to change role:\n{err}")
             return
 
         self.accept()
@@ -1,15 +1,14 @@
 from pathlib import Path
-from datetime import datetime
-import shutil
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QPushButton, QDialog, QFormLayout, QLineEdit, QLabel, QHBoxLayout,
     QWidget, QDialogButtonBox, QFileDialog, QMessageBox
 )
-from PyQt6.QtGui import QImage
-from PyQt6.QtSql import QSqlQuery
 from .phone_capture import PhoneCaptureDialog
+from . import face_store
+from .picture_jobs import PictureResult
+from database.repository import repository_for
 
 # --- use Documents\GymSoftware\faces instead of a local 'faces' folder ---
 from ctypes import windll, wintypes, byref
@@ -30,21 +29,6 @@ FACES_DIR = _documents_dir() / "GymSoftware" / "faces"
 FACES_DIR.mkdir(parents=True, exist_ok=True)
 # --------------------------------------------------------------------------
 
-def _safe_name(text: str) -> str:
-    return "".join(ch for ch in text.strip() if ch.isalnum() or ch in (" ", "_", "-")).strip().replace(" ", "_")
-
-def _save_image_as_jpg(src: Path, dst: Path) -> bool:
-    img = QImage(str(src))
-    if img.isNull():  # fallback to raw copy if Qt can't read
-        try:
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copyfile(src, dst)
-            return True
-        except Exception:
-            return False
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    return img.save(str(dst), "JPG")
-
 class AddClientDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -109,30 +93,16 @@ class AddClientDialog(QDialog):
     def _take_from_phone(self):
         dlg = PhoneCaptureDialog(self)
         if dlg.exec():  # Accepted
-            if dlg.selected_path:
-                self._img = Path(dlg.selected_path)
-                self.pic_label.setText(self._img.name)
+            if dlg.selected_data:
+                self._img = dlg.selected_data   # still in memory: written once, into the store
+                self.pic_label.setText(dlg.selected_name)
                 self.pic_label.setStyleSheet("")
         
-def _insert_client(db, full_name: str, id_card: int, phone: int | None, picture_path: str) -> tuple[bool, str]:
-    q = QSqlQuery(db)
-    q.prepare("""
-    INSERT INTO Client (full_name, id_card, phone_number, role, picture, created_at)
-    VALUES (?, ?, ?, 'client', ?, ?)
-""")
-    q.addBindValue(full_name)
-    q.addBindValue(id_card)
-    q.addBindValue(phone)
-    q.addBindValue(picture_path)
-    q.addBindValue(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-    if not q.exec():
-        return False, q.lastError().text()
-    return True, "ok"
-
 def create_add_client_button(parent, db, on_saved=lambda: None) -> QPushButton:
     """
     Returns a QPushButton wired to open the AddClientDialog,
-    copy the image to faces/, insert the row (role='client'), then call on_saved().
+    put the image in the face store (in the background), insert the row
+    (role='client') once the picture is stored, then call on_saved().
     """
     btn = QPushButton("Add Client", parent)
 
@@ -140,26 +110,35 @@ def create_add_client_button(parent, db, on_saved=lambda: None) -> QPushButton:
         dlg = AddClientDialog(parent)
         if dlg.exec():
             d = dlg.data()
-            name = d["name"]; id_card = int(d["id_card"])
-            phone = int(d["phone"]) if d["phone"] else None
+            name = d["name"]; id_card = d["id_card"]
+            phone = d["phone"] or None
             src = d["image"]
 
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            dst_name = f"{_safe_name(name)}_{id_card}_{ts}.jpg"
-            dst = FACES_DIR / dst_name
-
-            if not _save_image_as_jpg(src, dst):
-                QMessageBox.critical(parent, "Image Error", "Failed to save picture.")
-                return
+            # hashing / encoding runs on the picture pool; several adds may be in flight
+            face_store.ingest(db, src, FACES_DIR,
+                              lambda result: _insert_when_stored(name, id_card, phone, result),
+                              copy_unreadable=True)
 
-            ok, err = _insert_client(db, name, id_card, phone, str(dst.as_posix()))
-            if not ok:
-                dst.unlink(missing_ok=True)
-                QMessageBox.critical(parent, "Database Error", f"Could not insert client:\n{err}")
-                return
+    def _insert_when_stored(name: str, id_card: str, phone: str | None, result: PictureResult):
+        if not result.ok:
+            QMessageBox.critical(parent, "Image Error", result.error or "Failed to save picture.")
+            return
+        # row, store record and thumbnail / preview sizes in one transaction
+        repo = repository_for(db)
+        try:
+            with repo.transaction():
+                ok, err = repo.insert_client(name, id_card, phone, result.picture)
+                if ok:
+                    ok, err = face_store.record_blob(repo, result)
+                if not ok:
+                    raise RuntimeError(err)
+        except RuntimeError as e:
+            result.discard(repo)
+            QMessageBox.critical(parent, "Database Error", f"Could not insert client:\n{e}")
+            return
 
-            QMessageBox.information(parent, "Success", "Client added successfully.")
-            on_saved()
+        QMessageBox.information(parent, "Success", f"Client {name} added successfully.")
+        on_saved()
 
     btn.clicked.connect(on_click)
     return btn
@@ -1,48 +1,23 @@
 from pathlib import Path
 from datetime import date
+from functools import partial
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QFormLayout, QPushButton
 )
-from PyQt6.QtGui import QPixmap
-from PyQt6.QtSql import QSqlQuery
 
+from database.repository import repository_for
 from clientsManagement.edit_client import ClientEditDialog
 from .change_role import ChangeRoleDialog
 from .add_membership import AddMembershipDialog   # <-- NEW IMPORT
+from . import picture_jobs
+from .picture_jobs import PictureResult
+from .pictures import best_fit, make_derivatives
+from .pixmap_cache import pixmap_cache
 
 
-def _load_client(db, client_id: int) -> dict:
-    q = QSqlQuery(db)
-    q.prepare("""
-        SELECT id, full_name, id_card, phone_number, role, picture, created_at
-        FROM Client WHERE id = ?
-    """)
-    q.addBindValue(client_id)
-    q.exec()
-    if q.next():
-        return {
-            "id": q.value(0),
-            "full_name": q.value(1),
-            "id_card": q.value(2),
-            "phone_number": q.value(3),
-            "role": q.value(4),
-            "picture": q.value(5),
-            "created_at": q.value(6),
-        }
-    return {}
-
-
-def _latest_membership_end(db, client_id: int) -> str | None:
-    q = QSqlQuery(db)
-    q.prepare("SELECT MAX(date(end_date)) FROM memberships WHERE client_id = ?")
-    q.addBindValue(client_id)
-    if not q.exec():
-        return None
-    if q.next():
-        val = q.value(0)
-        return str(val) if val else None
-    return None
+def _make_sizes(path: str) -> PictureResult:
+    return PictureResult(True, picture=path, sizes=make_derivatives(Path(path)))
 
 
 def _status_from_end(end_str: str | None) -> tuple[str, str]:
@@ -67,8 +42,9 @@ class ClientInfoDialog(QDialog):
         self.setWindowTitle("Client Info")
         self.setMinimumSize(560, 420)
         self._db = db
+        self._repo = repository_for(db)
         self._client_id = client_id
-        self._data = _load_client(db, client_id)
+        self._data = self._repo.load_client(client_id)
 
         # Normal window controls
         self.setWindowFlags(
@@ -96,7 +72,7 @@ class ClientInfoDialog(QDialog):
         self.lbl_role = QLabel(str(self._data.get("role", "")))
         self.lbl_created = QLabel(str(self._data.get("created_at", "")))
 
-        latest_end = _latest_membership_end(self._db, self._client_id)
+        latest_end = self._repo.client_active_until(self._client_id)
         self.lbl_membership_end = QLabel(latest_end if latest_end else "No memberships yet")
         status_text, status_color = _status_from_end(latest_end)
         self.lbl_status = QLabel(status_text)
@@ -145,24 +121,43 @@ class ClientInfoDialog(QDialog):
         if not p.exists():
             self.pic_label.setText("Picture not found")
             return
-        pm = QPixmap(str(p))
+        sizes = self._repo.picture_sizes(path)
+        if not sizes:
+            # pictures saved before thumbnails existed: make them once, on the picture pool
+            self.pic_label.setText("Loading…")
+            picture_jobs.start(partial(_make_sizes, path), self._sizes_made)
+            return
+        self._show_picture(path, sizes)
+
+    def _show_picture(self, path: str, sizes: dict[int, str]):
+        dpr = self.devicePixelRatioF()
+        needed = round(max(self.pic_label.width(), self.pic_label.height()) * dpr)
+        pm = pixmap_cache().pixmap(best_fit(path, sizes, needed), self.pic_label.size(), dpr)
         if pm.isNull():
             self.pic_label.setText("Invalid image")
             return
-        self.pic_label.setPixmap(pm.scaled(
-            self.pic_label.size(),
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        ))
+        self.pic_label.setPixmap(pm)
+
+    def _sizes_made(self, result: PictureResult):
+        if result.ok and result.sizes:
+            try:
+                with self._repo.transaction():
+                    ok, err = self._repo.set_picture_sizes(result.picture, result.sizes)
+                    if not ok:
+                        raise RuntimeError(err)
+            except RuntimeError:
+                pass   # still shown from the files just written
+        if self._data.get("picture") == result.picture:   # not replaced meanwhile
+            self._show_picture(result.picture, result.sizes)
 
     def _refresh_labels(self):
-        self._data = _load_client(self._db, self._client_id)
+        self._data = self._repo.load_client(self._client_id)
         self.lbl_name.setText(str(self._data.get("full_name", "")))
         self.lbl_card.setText(str(self._data.get("id_card", "")))
         self.lbl_phone.setText(str(self._data.get("phone_number", "")))
         self.lbl_role.setText(str(self._data.get("role", "")))
         self._set_picture(self._data.get("picture"))
-        latest_end = _latest_membership_end(self._db, self._client_id)
+        latest_end = self._repo.client_active_until(self._client_id)
         self.lbl_membership_end.setText(latest_end if latest_end else "No memberships yet")
         status_text, status_color = _status_from_end(latest_end)
         self.lbl_status.setText(status_text)
@@ -173,16 +168,16 @@ class ClientInfoDialog(QDialog):
         dlg = ClientEditDialog(self._db, self._data, self)
         if dlg.exec():
             self._refresh_labels()
-            self.refreshed.emit()   # keep dialog open, refresh main table
+            self.refreshed.emit()   # keep dialog open (the main table follows database.changes)
 
     def _open_change_role(self):
         dlg = ChangeRoleDialog(self._db, self._client_id, self._data.get("role", ""), self)
         if dlg.exec():
             self._refresh_labels()
-            self.refreshed.emit()   # keep dialog open, refresh main table
+            self.refreshed.emit()   # keep dialog open (the main table follows database.changes)
 
     def _open_add_membership(self):
         dlg = AddMembershipDialog(self._db, self._client_id, self)
         if dlg.exec():
             self._refresh_labels()
-            self.refreshed.emit()   # keep dialog open, refresh main table
+            self.refreshed.emit()   # keep dialog open (the main table follows database.changes)
@@ -1,14 +1,15 @@
 from pathlib import Path
-from datetime import datetime
-import shutil
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QDialog, QFormLayout, QLineEdit, QLabel, QHBoxLayout, QWidget,
     QDialogButtonBox, QFileDialog, QPushButton, QMessageBox
 )
-from PyQt6.QtGui import QImage
-from PyQt6.QtSql import QSqlQuery
+
+from database.repository import repository_for
+from . import face_store
+from .picture_jobs import PictureResult
+from .pixmap_cache import pixmap_cache
 
 # --- use Documents\GymSoftware\faces instead of local 'faces' ---
 from ctypes import windll, wintypes, byref
@@ -27,73 +28,13 @@ def _documents_dir() -> Path:
 
 APP_DATA_DIR = _documents_dir() / "GymSoftware"
 FACES_DIR = APP_DATA_DIR / "faces"
-OLD_FACES_DIR = FACES_DIR / "oldFaces"
-OLD_FACES_DIR.mkdir(parents=True, exist_ok=True)
+FACES_DIR.mkdir(parents=True, exist_ok=True)
 # -----------------------------------------------------------------
 
-def _safe_name(text: str) -> str:
-    return "".join(ch for ch in text.strip() if ch.isalnum() or ch in (" ", "_", "-")).strip().replace(" ", "_")
-
-def _save_image_as_jpg(src_path: Path, dest_path: Path) -> bool:
-    img = QImage(str(src_path))
-    if img.isNull():
-        return False
-    dest_path.parent.mkdir(parents=True, exist_ok=True)
-    return img.save(str(dest_path), "JPG")
-
-def _update_client_row(db, client_id: int, name: str, id_card: int, phone: int | None) -> tuple[bool,str]:
-    q = QSqlQuery(db)
-    q.prepare("""
-        UPDATE Client
-        SET full_name = ?, id_card = ?, phone_number = ?
-        WHERE id = ?
-    """)
-    q.addBindValue(name)
-    q.addBindValue(id_card)
-    q.addBindValue(phone)
-    q.addBindValue(client_id)
-    ok = q.exec()
-    return ok, ("" if ok else q.lastError().text())
-
-def _replace_picture(db, client_id: int, old_path_str: str | None, new_src: Path, full_name: str, id_card: int) -> tuple[bool,str]:
-    # pick final destination (same filename if old exists; else standard name)
-    if old_path_str:
-        dest_path = Path(old_path_str)
-    else:
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        dest_path = FACES_DIR / f"{_safe_name(full_name)}_{id_card}_{ts}.jpg"
-
-    tmp_path = dest_path.with_suffix(".tmp.jpg")
-    if not _save_image_as_jpg(new_src, tmp_path):
-        tmp_path.unlink(missing_ok=True)
-        return False, "Failed to read/encode the new picture."
-
-    if old_path_str:
-        old_path = Path(old_path_str)
-        if old_path.exists():
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            moved_name = f"{old_path.stem}__OLD_{ts}{old_path.suffix}"
-            try:
-                shutil.move(str(old_path), str(OLD_FACES_DIR / moved_name))
-            except Exception:
-                # not fatal, just warn
-                pass
-
-    try:
-        tmp_path.replace(dest_path)
-    except Exception as e:
-        tmp_path.unlink(missing_ok=True)
-        return False, f"Could not finalize new picture: {e}"
-
-    # ensure DB has picture path if it was missing
-    if not old_path_str:
-        q = QSqlQuery(db)
-        q.prepare("UPDATE Client SET picture = ? WHERE id = ?")
-        q.addBindValue(str(dest_path.as_posix()))
-        q.addBindValue(client_id)
-        if not q.exec():
-            return False, "Picture saved, but DB path update failed."
-    return True, ""
+class _SaveError(Exception):
+    def __init__(self, title: str, message: str):
+        super().__init__(message)
+        self.title, self.message = title, message
 
 class ClientEditDialog(QDialog):
     """Modal dialog to edit name, id card, phone and optionally replace picture."""
@@ -103,6 +44,8 @@ class ClientEditDialog(QDialog):
         self._db = db
         self._client = client
         self._new_picture_path: Path | None = None
+        self._saving = False       # picture job in flight
+        self._abandoned = False    # closed while it ran: drop its result
 
         form = QFormLayout(self)
         self.name_edit = QLineEdit(str(client.get("full_name", "")))
@@ -122,6 +65,7 @@ class ClientEditDialog(QDialog):
 
         btns = QDialogButtonBox(QDialogButtonBox.StandardButton.Save | QDialogButtonBox.StandardButton.Cancel)
         btns.accepted.connect(self._save); btns.rejected.connect(self.reject)
+        self._save_btn = btns.button(QDialogButtonBox.StandardButton.Save)
         form.addRow(btns)
 
     def _choose_pic(self):
@@ -138,23 +82,70 @@ class ClientEditDialog(QDialog):
         if not name or not id_card_txt:
             QMessageBox.warning(self, "Missing data", "Name and ID card are required."); return
         try:
-            id_card = int(id_card_txt)
+            int(id_card_txt)
         except ValueError:
             QMessageBox.warning(self, "Invalid ID", "ID card must be a number."); return
-        phone_val = None
         if phone_txt:
-            try: phone_val = int(phone_txt)
+            try: int(phone_txt)
             except ValueError:
                 QMessageBox.warning(self, "Invalid phone", "Phone must be a number (or empty)."); return
 
-        ok, err = _update_client_row(self._db, self._client["id"], name, id_card, phone_val)
-        if not ok:
-            QMessageBox.critical(self, "Database Error", err); return
+        values = (name, id_card_txt, phone_txt or None)
+        if not self._new_picture_path:
+            self._commit(values, None)
+            return
+
+        # store it on the picture pool; the row only changes once it is stored
+        self._set_saving(True)
+        face_store.ingest(self._db, self._new_picture_path, FACES_DIR,
+                          lambda result: self._picture_stored(values, result))
+
+    def _picture_stored(self, values: tuple, result: PictureResult):
+        self._set_saving(False)
+        if self._abandoned:
+            result.discard(repository_for(self._db))
+            return
+        if not result.ok:
+            QMessageBox.critical(self, "Image Error", result.error)
+            return
+        self._commit(values, result)
+
+    def _commit(self, values: tuple, picture: PictureResult | None):
+        """
+        Row update + new picture in one transaction. The old picture stays in
+        the store; the Client UPDATE trigger records it in picture_history.
+        """
+        repo = repository_for(self._db)
+        client_id = self._client["id"]
+        old_picture = self._client.get("picture")
+        try:
+            with repo.transaction():
+                ok, err = repo.update_client(client_id, *values)
+                if not ok:
+                    raise _SaveError("Database Error", err)
+                if picture:
+                    ok, err = face_store.record_blob(repo, picture)
+                    if ok:
+                        ok, err = repo.set_client_picture(client_id, picture.picture)
+                    if not ok:
+                        raise _SaveError("Database Error", f"Could not record the new picture:\n{err}")
+        except (_SaveError, RuntimeError) as e:
+            if picture:
+                picture.discard(repo)
+            title, message = (e.title, e.message) if isinstance(e, _SaveError) else ("Database Error", str(e))
+            QMessageBox.critical(self, title, message); return
+
+        if picture and old_picture and old_picture != picture.picture:
+            # no longer shown for this client: free its decoded sizes
+            pixmap_cache().invalidate(old_picture, *repo.picture_sizes(old_picture).values())
+        self.accept()
 
-        if self._new_picture_path:
-            ok, err = _replace_picture(self._db, self._client["id"], self._client.get("picture"),
-                                       self._new_picture_path, name, id_card)
-            if not ok:
-                QMessageBox.critical(self, "Image Error", err); return
+    def _set_saving(self, saving: bool):
+        self._saving = saving
+        self._save_btn.setEnabled(not saving)
+        self._save_btn.setText("Saving…" if saving else "Save")
 
-        self.accept()
+    def reject(self):
+        if self._saving:
+            self._abandoned = True
+        super().reject()
@@ -0,0 +1,146 @@
+# clientsManagement/face_store.py
+"""
+Content-addressed store for client pictures.
+
+A stored picture is named by the sha256 of its JPEG bytes and sharded two
+levels deep, faces/ab/cd/<hash>.jpg (its sizes sit next to it as
+<hash>@64.jpg / <hash>@256.jpg), so no directory grows past a few hundred
+files however many clients there are.
+
+face_blobs records each stored file, the sha256 of the upload it was made
+from, and a reference count kept by triggers (clients showing it + rows of
+picture_history keeping it). Re-uploading a photo that was stored before is
+found by its source hash and costs no decode, no encode and no disk. A
+replaced picture stays where it is; the UPDATE trigger records it in
+picture_history instead of renaming it into oldFaces.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from PyQt6.QtCore import QBuffer, QIODevice
+
+from database.repository import repository_for
+from . import picture_jobs
+from .picture_jobs import PictureResult
+from .pictures import JPEG_QUALITY, SIZES, derivative_path, make_derivatives, read_image
+
+_CHUNK = 1 << 20
+
+
+def blob_path(root: Path, digest: str, suffix: str = ".jpg") -> Path:
+    return root / digest[:2] / digest[2:4] / f"{digest}{suffix}"
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_sha256(src: Path | bytes) -> str:
+    return hashlib.sha256(src).hexdigest() if isinstance(src, bytes) else file_sha256(src)
+
+
+def _existing_sizes(path: Path) -> dict[int, str]:
+    found = {size: derivative_path(path, size) for size in SIZES}
+    return {size: str(p.as_posix()) for size, p in found.items() if p.exists()}
+
+
+def _write_once(dst: Path, data: bytes) -> bool:
+    """
+    Write data to dst unless the store has it already. True if written. The
+    temp file is unique, so jobs storing the same photo at once do not clash.
+    """
+    if dst.exists():
+        return False
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=dst.parent, prefix=f".{dst.stem}.", suffix=".tmp",
+                                     delete=False) as f:
+        tmp = f.name
+        try:
+            f.write(data)
+        except OSError:
+            f.close()
+            os.unlink(tmp)
+            raise
+    if dst.exists():   # another job got there first
+        os.unlink(tmp)
+        return False
+    os.replace(tmp, dst)
+    return True
+
+
+# ---------------- Jobs (picture pool) ----------------
+def _hash(src: Path | bytes) -> PictureResult:
+    return PictureResult(True, source_hash=_source_sha256(src))
+
+
+def _store(src: Path | bytes, root: Path, source_hash: str, copy_unreadable: bool) -> PictureResult:
+    """
+    src (a file, or bytes) -> the store, at full resolution, plus its sizes.
+    A readable JPEG is kept byte for byte (EXIF orientation included); other
+    formats are encoded to JPEG.
+    """
+    data = src if isinstance(src, bytes) else src.read_bytes()
+    suffix = ".jpg"
+    if data.startswith(b"\xff\xd8\xff") and not read_image(data, max(SIZES)).isNull():
+        pass   # as-is
+    elif not (img := read_image(data)).isNull():
+        buf = QBuffer()
+        buf.open(QIODevice.OpenModeFlag.WriteOnly)
+        if not img.save(buf, "JPG", JPEG_QUALITY):
+            return PictureResult(False, "Failed to save picture.")
+        data = bytes(buf.data())
+    elif not copy_unreadable:
+        return PictureResult(False, "Failed to read/encode the new picture.")
+    elif not isinstance(src, bytes):   # keep as-is
+        suffix = src.suffix.lower() or ".jpg"
+    digest = hashlib.sha256(data).hexdigest()
+    dst = blob_path(root, digest, suffix)
+    created = _write_once(dst, data)
+    sizes = _existing_sizes(dst)
+    if len(sizes) < len(SIZES):
+        sizes = make_derivatives(dst)
+    return PictureResult(True, picture=str(dst.as_posix()), sizes=sizes, hash=digest,
+                         source_hash=source_hash, bytes=len(data), created=created)
+
+
+# ---------------- Ingest ----------------
+def ingest(db, src: Path | bytes, root: Path, on_done: Callable[[PictureResult], None],
+           copy_unreadable: bool = False) -> None:
+    """
+    Put src (a file, or a phone capture still in memory) in the store under
+    root (in the background); on_done(result) runs on the GUI thread. Record
+    the result with record_blob() in the same transaction as the row that
+    uses it.
+    """
+    repo = repository_for(db)
+
+    def hashed(result: PictureResult):
+        if not result.ok:
+            on_done(result)
+            return
+        known = repo.blob_for_source(result.source_hash)
+        if known and Path(known[1]).exists():
+            on_done(PictureResult(True, picture=known[1], sizes=repo.picture_sizes(known[1]),
+                                  hash=known[0], source_hash=result.source_hash))
+            return
+        picture_jobs.start(partial(_store, src, root, result.source_hash, copy_unreadable), on_done)
+
+    picture_jobs.start(partial(_hash, src), hashed)
+
+
+def record_blob(repo, result: PictureResult) -> tuple[bool, str]:
+    """face_blobs + picture_sizes rows for a stored picture; call inside repo.transaction()."""
+    if result.bytes:   # freshly stored (a reused blob is recorded already)
+        ok, err = repo.add_face_blob(result.hash, result.picture, result.bytes, result.source_hash)
+        if not ok:
+            return ok, err
+    return repo.set_picture_sizes(result.picture, result.sizes)
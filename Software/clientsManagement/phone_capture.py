@@ -1,15 +1,40 @@
 # phone_capture.py
+"""
+Take a client's picture with the gym phone over ADB.
+
+The dialog is a small state machine driven by QProcess: each adb command runs
+asynchronously (one at a time, with a timeout), and its result picks the next
+state. Nothing waits on adb on the GUI thread, so a slow or unplugged phone
+only shows up as a status line.
+
+    CHECKING_ADB -> CHECKING_DEVICE -> CHECKING_FOLDER -> WAITING -> PULLING -> SHOWING
+        |                |                  |               |
+      NO_ADB         NO_DEVICE          NO_FOLDER    (device lost: back to CHECKING_DEVICE)
+
+The "No…" states retry after a delay. From CHECKING_FOLDER on, one
+long-lived `adb shell` session (AdbWatch) watches ANDROID_DIR on the phone
+and streams only new file names back, so waiting costs no process spawns on
+either side and a photo is seen as soon as the camera has written it.
+
+A capture is streamed with `adb exec-out cat` into memory, previewed from
+those bytes, and handed to the caller as selected_data: the only disk write
+is the face store's. "Sync folder" (PhoneSync) copies the phone photos the
+inbox has not seen yet, by name, size and mtime, into INBOX_DIR.
+"""
 from __future__ import annotations
-import os, sys, shutil, subprocess
+import json, os, shlex, sys, shutil
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import QObject, QProcess, Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QDialogButtonBox, QPushButton, QWidget, QHBoxLayout
 )
 
+from .pictures import read_pixmap
+
 # ---------------- Paths (your logic kept) ----------------
 ANDROID_DIR = "/sdcard/Gymphotos"
 
@@ -31,7 +56,12 @@ def _documents_dir() -> Path:
 APP_DATA_DIR = _documents_dir() / "GymSoftware"
 INBOX_DIR = APP_DATA_DIR / "phone_inbox"
 
-# ---------------- ADB helpers (hardened) ----------------
+# ---------------- ADB ----------------
+ADB_TIMEOUT_MS = 2000      # state / listing commands
+PULL_TIMEOUT_MS = 15000    # a full-size photo over USB
+RETRY_MS = 1000            # re-check after "no device" / "no folder"
+NO_ADB_RETRY_MS = 3000
+
 def _adb_path() -> str:
     # 1) env override
     p = os.getenv("ADB_PATH")
@@ -45,69 +75,314 @@ def _adb_path() -> str:
     # 3) system PATH
     return shutil.which("adb") or "adb"
 
-# Hide spawned consoles on Windows and avoid UI stalls
-_STARTUPINFO = None
-_CREATE_NO_WINDOW = 0
-if os.name == "nt":
-    _STARTUPINFO = subprocess.STARTUPINFO()
-    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-    _CREATE_NO_WINDOW = 0x08000000
+class AdbCall(QObject):
+    """
+    One adb command on a QProcess. finished(code, stdout, stderr) is emitted
+    once; code is 124 on timeout and 127 when adb cannot be started, as the
+    old subprocess helper reported. stdout is the raw bytes with binary=True
+    (exec-out), else stripped text. (On Windows QProcess already starts
+    console programs without a window.)
+    """
+    finished = pyqtSignal(int, object, str)
 
-def _run_adb(args: list[str], timeout: float = 2.0) -> tuple[int, str, str]:
-    try:
-        p = subprocess.run(
-            [_adb_path()] + args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout,
-            startupinfo=_STARTUPINFO,
-            creationflags=_CREATE_NO_WINDOW,
-        )
-        return p.returncode, p.stdout.strip(), p.stderr.strip()
-    except subprocess.TimeoutExpired:
-        return 124, "", "timeout"
-    except FileNotFoundError:
-        return 127, "", "adb not found"
-
-def adb_device_ok() -> bool:
-    code, out, _ = _run_adb(["get-state"])
-    return code == 0 and out == "device"
-
-def adb_dir_exists(remote_dir: str) -> bool:
-    code, out, _ = _run_adb(["shell", f"[ -d '{remote_dir}' ] && echo OK || echo NO"])
-    return code == 0 and "OK" in out
-
-def newest_jpg(remote_dir: str) -> Optional[str]:
-    code, out, _ = _run_adb(["shell", f"ls -1t {remote_dir}/*.jpg 2>/dev/null"])
-    if code != 0 or not out:
-        return None
-    return out.splitlines()[0].strip()
-
-def pull_unique(remote_path: str, dest_dir: Path) -> Path:
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    base = dest_dir / Path(remote_path).name
-    target = base
-    i = 1
-    while target.exists():
-        target = dest_dir / f"{base.stem}_{i}{base.suffix}"
-        i += 1
-    _run_adb(["pull", remote_path, str(target)])
-    return target
+    def __init__(self, args: list[str], timeout_ms: int = ADB_TIMEOUT_MS, parent: QObject | None = None,
+                 binary: bool = False):
+        super().__init__(parent)
+        self._args = args
+        self._binary = binary
+        self._done = False
+        self._proc = QProcess(self)
+        self._proc.finished.connect(self._on_finished)
+        self._proc.errorOccurred.connect(self._on_error)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(timeout_ms)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def start(self):
+        self._timer.start()
+        self._proc.start(_adb_path(), self._args)
+
+    def cancel(self):
+        """Stop the command; finished is not emitted."""
+        self._done = True
+        self._timer.stop()
+        self._dispose()
+
+    def _dispose(self):
+        if self._proc.state() == QProcess.ProcessState.NotRunning:
+            self.deleteLater()
+        else:   # killed; deleted once it has actually exited
+            self._proc.finished.connect(self.deleteLater)
+            self._proc.kill()
+
+    def _emit(self, code: int, out: str | bytes, err: str):
+        if self._done:
+            return
+        self._done = True
+        self._timer.stop()
+        self.finished.emit(code, out, err)
+        self._dispose()
+
+    def _on_finished(self, code: int, status: QProcess.ExitStatus):
+        out = bytes(self._proc.readAllStandardOutput())
+        if not self._binary:
+            out = out.decode("utf-8", "replace").strip()
+        err = bytes(self._proc.readAllStandardError()).decode("utf-8", "replace").strip()
+        self._emit(code if status == QProcess.ExitStatus.NormalExit else 1, out, err)
+
+    def _on_error(self, error: QProcess.ProcessError):
+        if error == QProcess.ProcessError.FailedToStart:
+            self._emit(127, b"" if self._binary else "", "adb not found")
+
+    def _on_timeout(self):
+        self._emit(124, b"" if self._binary else "", "timeout")
+
+# Runs on the phone for as long as the dialog waits. Prints
+#   B <name>          newest photo on start (the baseline), E nofolder, M <mode>
+#   N <name>          (poll loop) a new newest photo, once it is complete
+#   w|y <dir> <name>  (inotifyd) a file was written / moved in
+# inotifyd reports at once; the slow loop next to it covers storage that does
+# not deliver inotify events. Without inotifyd the loop runs at WATCH_POLL_S.
+# inotifyd runs the echo binary per event: its "-" mode may sit in a stdio
+# buffer when stdout is a pipe.
+# A tick only stats the folder: the (sorting) ls -t runs when its mtime
+# changed. A new photo is reported once its size is the same on two ticks,
+# so one the camera is still writing is not pulled half-written.
+WATCH_POLL_S = 0.3
+WATCH_SAFETY_POLL_S = 2
+_WATCH_SCRIPT = (
+    "d='{d}'; "
+    "newest() {{ ls -t \"$d\" 2>/dev/null | grep -i -E -m 1 '\\.jpe?g$'; }}; "
+    "[ -d \"$d\" ] || {{ echo 'E nofolder'; exit 3; }}; "
+    "last=$(newest); echo \"B $last\"; "
+    "loop() {{ m=; n=$last; s=; while sleep $1; do "
+    "t=$(stat -c %y \"$d\" 2>/dev/null); [ \"$t\" != \"$m\" ] && {{ m=$t; n=$(newest); s=; }}; "
+    "[ -z \"$n\" ] || [ \"$n\" = \"$last\" ] && continue; "
+    "z=$(stat -c %s \"$d/$n\" 2>/dev/null); "
+    "[ -n \"$z\" ] && [ \"$z\" = \"$s\" ] && {{ echo \"N $n\"; last=$n; }}; s=$z; done; }}; "
+    "e=$(which echo 2>/dev/null); "
+    "if [ -n \"$e\" ] && command -v inotifyd >/dev/null 2>&1; then "
+    "echo 'M inotify'; loop {safety} & exec inotifyd \"$e\" \"$d\":wy; "
+    "else echo 'M poll'; loop {poll}; fi"
+)
+
+class AdbWatch(QObject):
+    """
+    The watch session. baseline(name) once, then photo(name) for each new
+    .jpg; no_folder() or ended() when the session stops (phone unplugged).
+    Names are relative to ANDROID_DIR and may repeat.
+    """
+    baseline = pyqtSignal(str)
+    photo = pyqtSignal(str)
+    no_folder = pyqtSignal()
+    ended = pyqtSignal()
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self.mode = ""
+        self._buf = b""
+        self._stopped = False
+        self._proc = QProcess(self)
+        self._proc.readyReadStandardOutput.connect(self._on_output)
+        self._proc.finished.connect(self._on_finished)
+        self._proc.errorOccurred.connect(self._on_error)
+
+    def start(self):
+        script = _WATCH_SCRIPT.format(d=ANDROID_DIR, poll=WATCH_POLL_S, safety=WATCH_SAFETY_POLL_S)
+        self._proc.start(_adb_path(), ["shell", script])
+
+    def stop(self):
+        """End the session (the phone side gets SIGHUP); no further signals."""
+        self._stopped = True
+        if self._proc.state() == QProcess.ProcessState.NotRunning:
+            self.deleteLater()
+        else:
+            self._proc.finished.connect(self.deleteLater)
+            self._proc.kill()
+
+    def _on_output(self):
+        self._buf += bytes(self._proc.readAllStandardOutput())
+        *lines, self._buf = self._buf.split(b"\n")
+        for raw in lines:
+            if not self._stopped:
+                self._line(raw.decode("utf-8", "replace").rstrip("\r"))
+
+    def _line(self, line: str):
+        event = line.split(" ", 2)
+        if len(event) == 3 and event[0] in ("w", "y") and event[1] == ANDROID_DIR:   # inotifyd
+            name = event[2]
+        elif line.startswith("N "):
+            name = line[2:]
+        elif line.startswith("B "):
+            self.baseline.emit(line[2:].strip())
+            return
+        elif line.startswith("M "):
+            self.mode = line[2:]
+            return
+        elif line == "E nofolder":
+            self.no_folder.emit()
+            return
+        else:
+            return
+        name = name.strip()
+        if name.lower().endswith((".jpg", ".jpeg")):
+            self.photo.emit(name)
+
+    def _on_finished(self, *args):
+        if not self._stopped:
+            self._stopped = True
+            self.ended.emit()
+            self.deleteLater()
+
+    def _on_error(self, error: QProcess.ProcessError):
+        if error == QProcess.ProcessError.FailedToStart:
+            self._on_finished()
+
+def _is_jpeg(data: bytes) -> bool:
+    # exec-out reports no exit status; an error message is not a JPEG
+    return data.startswith(b"\xff\xd8\xff")
+
+# ---------------- Inbox sync ----------------
+MANIFEST_NAME = "manifest.json"
+_MANIFEST_SAVE_EVERY = 20
+# no nocaseglob on the phone's shell: the patterns spell out both cases
+_LIST_SCRIPT = "cd '{d}' 2>/dev/null && stat -c '%s %Y %n' *.[jJ][pP][gG] *.[jJ][pP][eE][gG] 2>/dev/null"
+
+class PhoneSync(QObject):
+    """
+    Copy the photos in ANDROID_DIR that dest has not seen yet. Seen files are
+    kept in dest/manifest.json as name -> [size, mtime], so a photo is pulled
+    once even after the inbox copy is deleted. Without a manifest (deleted,
+    unreadable), a copy already in dest with the listed size counts as seen.
+    """
+    progress = pyqtSignal(int, int)   # done, total
+    finished = pyqtSignal(int, str)   # files copied, error ("" when done)
+
+    def __init__(self, dest: Path, parent: QObject | None = None):
+        super().__init__(parent)
+        self._dest = dest
+        self._manifest_path = dest / MANIFEST_NAME
+        self._manifest: dict[str, list[int]] = {}
+        self._todo: list[tuple[str, int, int]] = []
+        self._total = self._copied = self._failed = 0
+        self._call: AdbCall | None = None
+
+    def start(self):
+        try:
+            self._manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._manifest = {}
+        self._run(["shell", _LIST_SCRIPT.format(d=ANDROID_DIR)], self._on_listing)
+
+    def cancel(self):
+        if self._call is not None:
+            self._call.cancel()
+            self._call = None
+        self._save_manifest()
+
+    def _run(self, args: list[str], on_done, timeout_ms: int = ADB_TIMEOUT_MS, binary: bool = False):
+        self._call = AdbCall(args, timeout_ms, self, binary)
+        self._call.finished.connect(on_done)
+        self._call.start()
+
+    def _on_listing(self, code: int, out: str, err: str):
+        self._call = None
+        if code in (124, 127) or err.startswith("error:"):
+            self.finished.emit(0, err or f"adb exited with {code}")
+            return
+        for line in out.splitlines():
+            parts = line.split(" ", 2)
+            if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+                size, mtime, name = int(parts[0]), int(parts[1]), parts[2]
+                seen = self._manifest.get(name)
+                if seen == [size, mtime]:
+                    continue
+                if seen is None and self._have_copy(name, size):
+                    self._manifest[name] = [size, mtime]   # saved with the rest at the end
+                    continue
+                self._todo.append((name, size, mtime))
+        self._total = len(self._todo)
+        self._next()
+
+    def _have_copy(self, name: str, size: int) -> bool:
+        try:
+            return (self._dest / name).stat().st_size == size
+        except OSError:
+            return False
+
+    def _next(self):
+        self.progress.emit(self._copied + self._failed, self._total)
+        if not self._todo:
+            self._save_manifest()
+            failed = f"{self._failed} could not be copied" if self._failed else ""
+            self.finished.emit(self._copied, failed)
+            return
+        name, size, mtime = self._todo.pop(0)
+        self._run(["exec-out", f"cat {shlex.quote(f'{ANDROID_DIR}/{name}')}"],
+                  lambda code, data, err: self._on_pulled(name, size, mtime, code, data),
+                  PULL_TIMEOUT_MS, binary=True)
+
+    def _on_pulled(self, name: str, size: int, mtime: int, code: int, data: bytes):
+        self._call = None
+        if code == 0 and len(data) == size:
+            self._dest.mkdir(parents=True, exist_ok=True)
+            tmp = self._dest / f".{name}.part"
+            try:
+                tmp.write_bytes(data)
+                tmp.replace(self._dest / name)
+                self._manifest[name] = [size, mtime]
+                self._copied += 1
+                if self._copied % _MANIFEST_SAVE_EVERY == 0:
+                    self._save_manifest()
+            except OSError:
+                tmp.unlink(missing_ok=True)
+                self._failed += 1
+        else:
+            self._failed += 1
+        self._next()
+
+    def _save_manifest(self):
+        try:
+            self._dest.mkdir(parents=True, exist_ok=True)
+            tmp = self._manifest_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._manifest), encoding="utf-8")
+            tmp.replace(self._manifest_path)
+        except OSError:
+            pass   # pulled again next time
 
 # ---------------- Dialog ----------------
+class State(Enum):
+    CHECKING_ADB = "Looking for ADB…"
+    NO_ADB = "ADB not found. Bundle adb.exe or set ADB_PATH."
+    CHECKING_DEVICE = "Looking for the phone…"
+    NO_DEVICE = "Waiting for device via ADB… (USB debugging ON? Authorized?)"
+    CHECKING_FOLDER = "Looking for the photo folder…"
+    NO_FOLDER = f"Waiting for folder on phone: {ANDROID_DIR}"
+    WAITING = "Waiting for a picture… open camera and take a photo."
+    PULLING = "Receiving photo…"
+    SHOWING = "New photo received"
+
 class PhoneCaptureDialog(QDialog):
     """
-    Waits for a new JPG in ANDROID_DIR, pulls it to INBOX_DIR,
-    shows a preview, Accept exposes 'selected_path'.
+    Waits for a new JPG in ANDROID_DIR, streams it into memory,
+    shows a preview, Accept exposes 'selected_data' / 'selected_name'.
     """
+    state_changed = pyqtSignal(object)   # State
+
     def __init__(self, parent: QWidget | None = None):
         super().__init__(parent)
         self.setWindowTitle("Take picture from phone")
         self.resize(560, 640)
 
+        self.state = State.CHECKING_ADB
         self._baseline: Optional[str] = None
-        self.selected_path: Optional[Path] = None
+        self._have_baseline = False
+        self._call: AdbCall | None = None
+        self._watch: AdbWatch | None = None
+        self._sync: PhoneSync | None = None
+        self.selected_data: Optional[bytes] = None
+        self.selected_name = ""
 
         self.v = QVBoxLayout(self)
         self.info = QLabel("", self)
@@ -118,6 +393,14 @@ class PhoneCaptureDialog(QDialog):
         self.preview.setMinimumSize(480, 480)
         self.preview.setStyleSheet("background:#222; color:#bbb;")
 
+        self.sync_info = QLabel("", self)
+        self.sync_info.setStyleSheet("color: gray;")
+        self.btn_sync = QPushButton("Sync folder")
+        self.btn_sync.setToolTip(f"Copy the phone photos not copied yet to {INBOX_DIR}")
+        sync_row = QHBoxLayout()
+        sync_row.addWidget(self.sync_info, 1)
+        sync_row.addWidget(self.btn_sync, 0)
+
         self.btns = QDialogButtonBox(self)
         self.btn_accept = QPushButton("Accept")
         self.btn_again = QPushButton("Do it again")
@@ -128,49 +411,137 @@ class PhoneCaptureDialog(QDialog):
 
         self.v.addWidget(self.info)
         self.v.addWidget(self.preview, 1)
+        self.v.addLayout(sync_row)
         self.v.addWidget(self.btns)
 
         self.btn_accept.clicked.connect(self._accept)
         self.btn_again.clicked.connect(self._reset_waiting)
         self.btn_close.clicked.connect(self.reject)
+        self.btn_sync.clicked.connect(self._start_sync)
 
+        # next step after a delay (retries, polling); never overlaps a running command
         self.timer = QTimer(self)
-        self.timer.setInterval(1000)   # 1s polling
-        self.timer.timeout.connect(self._tick)
+        self.timer.setSingleShot(True)
+        self._next_step: Callable[[], None] = self._check_adb
+        self.timer.timeout.connect(lambda: self._next_step())
 
         self._enter_waiting()
 
-    def _enter_waiting(self):
-        INBOX_DIR.mkdir(parents=True, exist_ok=True)
+    # -------- state machine --------
+    def _set_state(self, state: State, text: str | None = None):
+        self.state = state
+        self._set_info(text or state.value)
+        self.state_changed.emit(state)
+
+    def _adb(self, args: list[str], on_done: Callable[[int, str | bytes, str], None],
+             timeout_ms: int = ADB_TIMEOUT_MS):
+        self._call = AdbCall(args, timeout_ms, self, binary=args[0] == "exec-out")
+        self._call.finished.connect(lambda code, out, err: self._finished(on_done, code, out, err))
+        self._call.start()
+
+    def _finished(self, on_done, code: int, out: str, err: str):
+        self._call = None
+        on_done(code, out, err)
+
+    def _later(self, step: Callable[[], None], ms: int):
+        self._next_step = step
+        self.timer.start(ms)
+
+    def _stop(self):
+        self.timer.stop()
+        if self._call is not None:
+            self._call.cancel()
+            self._call = None
+        if self._watch is not None:
+            self._watch.stop()
+            self._watch = None
 
-        code, _, _ = _run_adb(["version"])
+    def _check_adb(self):
+        self._set_state(State.CHECKING_ADB)
+        self._adb(["version"], self._on_version)
+
+    def _on_version(self, code: int, out: str, err: str):
         if code == 127:
-            self._set_info("ADB not found. Bundle adb.exe or set ADB_PATH.")
-        elif not adb_device_ok():
-            self._set_info("Waiting for device via ADB… (USB debugging ON? Authorized?)")
-        elif not adb_dir_exists(ANDROID_DIR):
-            self._set_info(f"Waiting for folder on phone: {ANDROID_DIR}")
+            self._set_state(State.NO_ADB)
+            self._later(self._check_adb, NO_ADB_RETRY_MS)
+        else:
+            self._check_device()
+
+    def _check_device(self):
+        if self.state not in (State.NO_DEVICE, State.WAITING):
+            self._set_state(State.CHECKING_DEVICE)
+        self._adb(["get-state"], self._on_device)
+
+    def _on_device(self, code: int, out: str, err: str):
+        if code == 0 and out == "device":
+            self._check_folder()
         else:
-            self._set_info("Waiting for a picture… open camera and take a photo.")
+            self._set_state(State.NO_DEVICE)
+            self._later(self._check_device, RETRY_MS)
+
+    def _check_folder(self):
+        # the watch checks the folder itself, then keeps running
+        self._watch = AdbWatch(self)
+        self._watch.baseline.connect(self._on_baseline)
+        self._watch.photo.connect(self._on_photo)
+        self._watch.no_folder.connect(self._on_no_folder)
+        self._watch.ended.connect(self._on_watch_ended)
+        self._watch.start()
+
+    def _on_baseline(self, name: str):
+        if not self._have_baseline:
+            # photos already on the phone are not "new"
+            self._baseline, self._have_baseline = name or None, True
+        self._set_state(State.WAITING)
+        if name and name != self._baseline:
+            self._on_photo(name)   # taken while the session was being (re)started
 
-        self.selected_path = None
+    def _on_photo(self, name: str):
+        if self.state == State.WAITING and name != self._baseline:
+            self._pull(f"{ANDROID_DIR}/{name}")
+
+    def _on_no_folder(self):
+        self._set_state(State.NO_FOLDER)
+
+    def _on_watch_ended(self):
+        self._watch = None
+        if self.state not in (State.PULLING, State.SHOWING):
+            self._later(self._check_device, RETRY_MS)   # phone gone? start over
+
+    def _pull(self, remote: str):
+        self._set_state(State.PULLING)
+        self._adb(["exec-out", f"cat {shlex.quote(remote)}"],
+                  lambda code, data, err: self._on_pulled(remote, code, data, err), PULL_TIMEOUT_MS)
+
+    def _on_pulled(self, remote: str, code: int, data: bytes, err: str):
+        name = Path(remote).name
+        if code == 0 and _is_jpeg(data):
+            self._baseline = name
+            self._enter_showing(name, data)
+            return
+        self._set_state(State.WAITING, f"Could not receive the photo ({err or code}); retrying…")
+        if self._watch is None:
+            self._later(self._check_device, RETRY_MS)
+        else:
+            self._later(lambda: self._on_photo(name), RETRY_MS)
+
+    # -------- UI --------
+    def _enter_waiting(self):
+        self._stop()
+        self.selected_data, self.selected_name = None, ""
         self.btn_accept.setEnabled(False)
         self.btn_again.setEnabled(False)
-        self._baseline = newest_jpg(ANDROID_DIR)
         self.preview.setPixmap(QPixmap())
         self.preview.setText("Waiting…")
-        self.timer.start()
+        self._check_adb()
 
-    def _enter_showing(self, local_path: Path):
-        self.timer.stop()
-        self.selected_path = local_path
-        self._set_info(f"New photo received: {local_path.name}")
+    def _enter_showing(self, name: str, data: bytes):
+        self._stop()
+        self.selected_data, self.selected_name = data, name
+        self._set_state(State.SHOWING, f"New photo received: {name}")
 
-        pm = QPixmap(str(local_path))
+        pm = read_pixmap(data, self.preview.size(), self.devicePixelRatioF())
         if not pm.isNull():
-            pm = pm.scaled(self.preview.size(),
-                           Qt.AspectRatioMode.KeepAspectRatio,
-                           Qt.TransformationMode.SmoothTransformation)
             self.preview.setPixmap(pm)
             self.preview.setText("")
         else:
@@ -179,25 +550,36 @@ class PhoneCaptureDialog(QDialog):
         self.btn_accept.setEnabled(True)
         self.btn_again.setEnabled(True)
 
-    def _tick(self):
-        # fast exits avoid blocking the UI
-        if not adb_device_ok() or not adb_dir_exists(ANDROID_DIR):
-            return
-        current = newest_jpg(ANDROID_DIR)
-        if not current:
-            return
-        if (self._baseline is None) or (current != self._baseline):
-            local = pull_unique(current, INBOX_DIR)
-            self._enter_showing(local)
-
     def _set_info(self, text: str):
         self.info.setText(text)
 
     def _reset_waiting(self):
         self._enter_waiting()
 
+    def _start_sync(self):
+        self.btn_sync.setEnabled(False)
+        self.sync_info.setText("Listing phone photos…")
+        self._sync = PhoneSync(INBOX_DIR, self)
+        self._sync.progress.connect(
+            lambda done, total: self.sync_info.setText(f"Copying new photos… {done}/{total}"))
+        self._sync.finished.connect(self._on_synced)
+        self._sync.start()
+
+    def _on_synced(self, copied: int, error: str):
+        self._sync = None
+        self.btn_sync.setEnabled(True)
+        text = f"{copied} new photo(s) copied to {INBOX_DIR.name}"
+        self.sync_info.setText(f"{text}; {error}" if error else text)
+
     def _accept(self):
-        if self.selected_path and self.selected_path.exists():
+        if self.selected_data:
             self.accept()
         else:
             self._enter_waiting()
+
+    def done(self, result: int):
+        self._stop()   # no adb left running once the dialog is closed
+        if self._sync is not None:
+            self._sync.cancel()
+            self._sync = None
+        super().done(result)
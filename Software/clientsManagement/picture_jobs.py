@@ -0,0 +1,87 @@
+# clientsManagement/picture_jobs.py
+"""
+Picture file work off the GUI thread.
+
+Hashing and encoding a phone photo into the face store (see face_store.py)
+runs on a shared pool: start(work, on_done) runs work() on a pool thread and
+delivers its PictureResult to on_done on the GUI thread. Callers write the
+database only after a job succeeded.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+@dataclass
+class PictureResult:
+    ok: bool
+    error: str = ""
+    picture: str = ""                                   # stored original (posix path)
+    sizes: dict[int, str] = field(default_factory=dict)
+    hash: str = ""                                      # sha256 of the stored file
+    source_hash: str = ""                               # sha256 of the file it was made from
+    bytes: int = 0
+    created: bool = False                               # the job wrote picture (not reused)
+
+    def discard(self, repo) -> None:
+        """
+        Delete what the job wrote (the database write failed). Kept if a
+        concurrent save of the same photo has since committed a row using it.
+        """
+        if not self.created:
+            return   # already in the store: other rows may use it
+        if repo.face_blob_refcount(self.hash) != 0:
+            return   # in use, or unknown: leave it to tools/faces_scan
+        for path in [self.picture, *self.sizes.values()]:
+            if path:
+                Path(path).unlink(missing_ok=True)
+
+
+class _Signals(QObject):
+    done = pyqtSignal(object)
+
+
+class _PictureJob(QRunnable):
+    def __init__(self, work: Callable[[], PictureResult]):
+        super().__init__()
+        self.setAutoDelete(False)   # Python keeps the job (and its signals) until done
+        self.signals = _Signals()
+        self._work = work
+
+    def run(self):
+        try:
+            result = self._work()
+        except Exception as e:
+            result = PictureResult(False, str(e))
+        self.signals.done.emit(result)
+
+
+# ---------------- Pool ----------------
+_POOL: QThreadPool | None = None
+_RUNNING: set[_PictureJob] = set()
+
+
+def start(work: Callable[[], PictureResult],
+          on_done: Callable[[PictureResult], None] = lambda r: None) -> None:
+    """Run work() on the picture pool; on_done(result) is called on the GUI thread."""
+    global _POOL
+    if _POOL is None:
+        _POOL = QThreadPool()
+        _POOL.setMaxThreadCount(max(2, QThreadPool.globalInstance().maxThreadCount() // 2))
+    job = _PictureJob(work)
+
+    def finished(result: PictureResult):
+        _RUNNING.discard(job)
+        on_done(result)
+
+    _RUNNING.add(job)
+    job.signals.done.connect(finished)
+    _POOL.start(job)
+
+
+def wait_for_all(msecs: int = -1) -> bool:
+    """Block until queued jobs are done (tools / shutdown)."""
+    return _POOL.waitForDone(msecs) if _POOL is not None else True
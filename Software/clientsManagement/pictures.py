@@ -0,0 +1,99 @@
+# clientsManagement/pictures.py
+"""
+Stored, downscaled copies of client pictures.
+
+Phone photos are several MB. Next to each original in faces/ we keep
+`<stem>@64.jpg` (table thumbnail) and `<stem>@256.jpg` (dialog preview), made
+once when the picture is saved and recorded in the picture_sizes table, so a
+viewer decodes a few KB instead of the full photo.
+
+Every picture is read through read_image(): QImageReader decodes straight to
+the size asked for (for JPEG, libjpeg's DCT scaling skips most of the work)
+and turns the photo upright from the EXIF orientation tag phone cameras write.
+A phone capture is read the same way from the bytes received over adb.
+"""
+from __future__ import annotations
+from pathlib import Path
+
+from PyQt6.QtCore import Qt, QBuffer, QIODevice, QSize
+from PyQt6.QtGui import QImage, QImageIOHandler, QImageReader, QPixmap
+
+THUMB_SIZE = 64
+PREVIEW_SIZE = 256
+SIZES = (THUMB_SIZE, PREVIEW_SIZE)
+JPEG_QUALITY = 85
+
+
+# ---------------- Loading ----------------
+def read_image(path: str | Path | bytes, fit: QSize | int | None = None) -> QImage:
+    """
+    Decode path (or the image bytes), upright, at the smallest size that still
+    covers fit (a box, or a length for the long side). Never upscales. Null
+    QImage on failure.
+    """
+    if isinstance(path, bytes):
+        buf = QBuffer()
+        buf.setData(path)
+        buf.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buf)
+    else:
+        reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    if fit is not None:
+        box = QSize(fit, fit) if isinstance(fit, int) else QSize(fit)
+        raw = reader.size()   # from the header, before EXIF rotation
+        if raw.isValid() and box.isValid():
+            if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+                box.transpose()   # the box applies to the rotated image
+            target = raw.scaled(box, Qt.AspectRatioMode.KeepAspectRatio)
+            if target.width() < raw.width():
+                reader.setScaledSize(target)
+    return reader.read()
+
+
+def read_pixmap(path: str | Path | bytes, fit: QSize, device_pixel_ratio: float = 1.0) -> QPixmap:
+    """A pixmap for a widget of size fit (logical pixels), sharp on HiDPI screens."""
+    img = read_image(path, QSize(round(fit.width() * device_pixel_ratio),
+                                 round(fit.height() * device_pixel_ratio)))
+    pm = QPixmap.fromImage(img)
+    pm.setDevicePixelRatio(device_pixel_ratio)
+    return pm
+
+
+# ---------------- Stored sizes ----------------
+def derivative_path(original: Path, size: int) -> Path:
+    return original.with_name(f"{original.stem}@{size}.jpg")
+
+
+def make_derivatives(original: Path) -> dict[int, str]:
+    """
+    Write the downscaled copies of original. Returns {size: path} for the ones
+    written; empty if the picture cannot be read (viewers then use the original).
+    """
+    img = read_image(original, max(SIZES))   # one scaled decode serves every size
+    if img.isNull():
+        return {}
+    made = {}
+    for size in SIZES:
+        dst = derivative_path(original, size)
+        tmp = dst.with_suffix(".tmp.jpg")
+        scaled = img.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation)
+        if not scaled.save(str(tmp), "JPG", JPEG_QUALITY):
+            tmp.unlink(missing_ok=True)
+            continue
+        try:
+            tmp.replace(dst)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            continue
+        made[size] = str(dst.as_posix())
+    return made
+
+
+def best_fit(original: str, sizes: dict[int, str], needed_px: int) -> str:
+    """The smallest stored size that is at least needed_px, else the original."""
+    for size in sorted(sizes):
+        if size >= needed_px and Path(sizes[size]).exists():
+            return sizes[size]
+    return original
@@ -0,0 +1,104 @@
+# clientsManagement/pixmap_cache.py
+"""
+Decoded, scaled client pictures, shared by every view (GUI thread).
+
+Going back and forth between clients at the desk shows the same few faces
+over and over; decoding each from disk again costs far more than keeping the
+pixmap. Entries are keyed by (path, size in device pixels, mtime), so a file
+rewritten in place is never served stale, and are evicted least recently
+used first once the decoded pixels pass max_bytes.
+"""
+from __future__ import annotations
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QPixmap
+
+from .pictures import read_pixmap
+
+MAX_BYTES = 64 * 1024 * 1024   # ~250 dialog pictures or ~4000 table thumbnails
+
+_Key = tuple[str, int, int, int]
+
+
+class PixmapCache:
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[_Key, QPixmap] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ---- keys ----
+    @staticmethod
+    def key(path: str | Path, fit: QSize, device_pixel_ratio: float = 1.0) -> _Key | None:
+        """Cache key for path shown in a fit-sized widget; None if the file is gone."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return (Path(path).as_posix(), round(fit.width() * device_pixel_ratio),
+                round(fit.height() * device_pixel_ratio), mtime)
+
+    # ---- lookups ----
+    def get(self, key: _Key | None) -> QPixmap | None:
+        pm = self._entries.get(key) if key is not None else None
+        if pm is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pm
+
+    def put(self, key: _Key | None, pm: QPixmap) -> None:
+        if key is None or pm.isNull():
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= _cost(old)
+        self._entries[key] = pm
+        self._bytes += _cost(pm)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= _cost(evicted)
+
+    def pixmap(self, path: str | Path, fit: QSize, device_pixel_ratio: float = 1.0) -> QPixmap:
+        """read_pixmap() through the cache."""
+        key = self.key(path, fit, device_pixel_ratio)
+        pm = self.get(key)
+        if pm is None:
+            pm = read_pixmap(path, fit, device_pixel_ratio)
+            self.put(key, pm)
+        return pm
+
+    # ---- upkeep ----
+    def invalidate(self, *paths: str | Path) -> None:
+        """Drop every size of paths (a picture that was replaced)."""
+        gone = {Path(p).as_posix() for p in paths if p}
+        for key in [k for k in self._entries if k[0] in gone]:
+            self._bytes -= _cost(self._entries.pop(key))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._entries), "bytes": self._bytes}
+
+
+def _cost(pm: QPixmap) -> int:
+    return pm.width() * pm.height() * max(pm.depth(), 8) // 8
+
+
+_CACHE: PixmapCache | None = None
+
+
+def pixmap_cache() -> PixmapCache:
+    """The application-wide cache (GUI thread)."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = PixmapCache()
+    return _CACHE
@@ -0,0 +1,27 @@
+# database/changes.py
+"""
+Change notifications for views that cache rows.
+
+The repository emits the primary keys it touched after each successful write
+(after COMMIT when inside a transaction), so a view can refetch just those
+rows instead of reloading the whole table.
+"""
+from __future__ import annotations
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class ChangeNotifier(QObject):
+    clients_inserted = pyqtSignal(list)   # new Client ids
+    clients_changed = pyqtSignal(list)    # Client ids whose row (or active_until) changed
+
+
+_NOTIFIER: ChangeNotifier | None = None
+
+
+def notifier() -> ChangeNotifier:
+    """The application-wide notifier (GUI thread)."""
+    global _NOTIFIER
+    if _NOTIFIER is None:
+        _NOTIFIER = ChangeNotifier()
+    return _NOTIFIER
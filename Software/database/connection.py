@@ -0,0 +1,115 @@
+# database/connection.py
+"""
+WAL-mode SQLite connections.
+
+The GUI thread owns one writer connection. Every thread that only reads gets
+its own query_only connection, because a QSqlDatabase may only be used by the
+thread that opened it. With WAL, readers never block the writer (and a long
+report never holds up a check-in insert).
+
+Readers are keyed by the OS thread, so a thread keeps one connection however
+many jobs it runs. A thread that ends must close its reader first
+(close_reader()); close() closes whatever is left when the app shuts down.
+Both drop the connection's cached repository first; views holding a reader
+(EntriesViewDialog) let go of it when they close.
+"""
+from __future__ import annotations
+import itertools
+import threading
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from .repository import release_repository
+
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 32 * 1024          # per connection page cache
+MMAP_SIZE = 256 * 1024 * 1024       # map up to 256 MB of the file
+
+_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",  # safe with WAL, avoids an fsync per commit
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def _exec(db: QSqlDatabase, sql: str) -> None:
+    q = QSqlQuery(db)
+    if not q.exec(sql):
+        raise RuntimeError(f"{sql} failed: {q.lastError().text()}")
+    q.finish()
+
+
+class ConnectionManager:
+    """Hands out the writer connection and per-thread reader connections."""
+
+    def __init__(self, db_path: str, name: str = "gym"):
+        self._db_path = db_path
+        self._name = name
+        self._ids = itertools.count(1)
+        self._readers: dict[int, str] = {}   # thread ident -> connection name of its reader
+        self._lock = threading.Lock()
+
+        self._writer = self._open(f"{name}_writer")
+        _exec(self._writer, "PRAGMA journal_mode = WAL")  # persistent, stored in the file
+
+    def _open(self, conn_name: str, read_only: bool = False) -> QSqlDatabase:
+        db = QSqlDatabase.addDatabase("QSQLITE", conn_name)
+        db.setDatabaseName(self._db_path)
+        db.setConnectOptions(f"QSQLITE_BUSY_TIMEOUT={BUSY_TIMEOUT_MS}")
+        if not db.open():
+            raise RuntimeError(f"Cannot open SQLite database: {db.lastError().text()}")
+        for pragma in _PRAGMAS:
+            _exec(db, pragma)
+        if read_only:
+            _exec(db, "PRAGMA query_only = ON")
+        return db
+
+    def writer(self) -> QSqlDatabase:
+        """The single read/write connection. GUI thread only."""
+        return self._writer
+
+    def reader(self) -> QSqlDatabase:
+        """A read-only connection owned by the calling thread (opened on first use)."""
+        # not threading.local: PyQt gives pool threads a new Python thread state per run()
+        thread = threading.get_ident()
+        with self._lock:
+            name = self._readers.get(thread)
+        if name is not None:
+            db = QSqlDatabase.database(name, False)
+            if db.isValid():
+                return db
+            # another thread's: it ended without close_reader() and its id was reused
+            del db
+            release_repository(name)
+            QSqlDatabase.removeDatabase(name)
+        name = f"{self._name}_reader_{next(self._ids)}"
+        db = self._open(name, read_only=True)
+        with self._lock:
+            self._readers[thread] = name
+        return db
+
+    def close_reader(self) -> None:
+        """Close the calling thread's reader (call it before the thread ends)."""
+        with self._lock:
+            name = self._readers.pop(threading.get_ident(), None)
+        if name is not None:
+            self._remove(name)
+
+    @staticmethod
+    def _remove(name: str) -> None:
+        release_repository(name)   # removeDatabase() wants no handle left
+        QSqlDatabase.removeDatabase(name)   # closes it
+
+    def open_readers(self) -> int:
+        with self._lock:
+            return len(self._readers)
+
+    def close(self) -> None:
+        """Close every reader and the writer (app shutdown)."""
+        with self._lock:
+            names, self._readers = list(self._readers.values()), {}
+        for name in names:
+            self._remove(name)
+        self._writer.close()   # repositories still hold it; only the file is released
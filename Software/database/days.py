@@ -0,0 +1,27 @@
+# database/days.py
+"""
+Integer day keys: days since 1970-01-01.
+
+memberships.start_day / end_day and entries.day are generated from the text
+dates with DAY_KEY_SQL, so date predicates compare plain indexed integers
+instead of wrapping the column in date().
+"""
+from __future__ import annotations
+from datetime import date, timedelta
+
+EPOCH = date(1970, 1, 1)
+
+# SQL for a column's day key; works for 'YYYY-MM-DD' and 'YYYY-MM-DD HH:MM:SS'
+DAY_KEY_SQL = "CAST(julianday({column}) - 2440587.5 AS INTEGER)"
+
+
+def day_key(d: date) -> int:
+    return (d - EPOCH).days
+
+
+def key_date(key: int) -> date:
+    return EPOCH + timedelta(days=key)
+
+
+def today_key() -> int:
+    return day_key(date.today())
@@ -0,0 +1,440 @@
+# database/migrations.py
+"""
+Versioned schema migrations for gym.db.
+
+Every change to the schema is an ordered Migration step. The applied steps are
+recorded in the `schema_version` table, so an existing gym.db is upgraded in
+place the next time the app (or InitializeGymData) starts.
+"""
+from __future__ import annotations
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .days import DAY_KEY_SQL
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _statements(script: str) -> Iterator[str]:
+    """Split a SQL script into complete statements (trigger bodies stay whole)."""
+    buf = ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            yield buf.strip()
+            buf = ""
+    if buf.strip():
+        yield buf.strip()
+
+
+def _script(sql: str) -> Callable[[sqlite3.Connection], None]:
+    # executescript() would COMMIT on its own; run statement by statement instead
+    # so each migration stays inside the runner's transaction.
+    def apply(conn: sqlite3.Connection) -> None:
+        for stmt in _statements(sql):
+            conn.execute(stmt)
+    return apply
+
+
+# ---------------- Steps ----------------
+_BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Client (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    id_card INTEGER UNIQUE NOT NULL,
+    phone_number INTEGER,
+    role TEXT CHECK(role IN ('owner', 'client', 'coach')) NOT NULL,
+    picture TEXT,
+    created_at DATE DEFAULT CURRENT_DATE
+);
+CREATE TABLE IF NOT EXISTS membership_plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    months INTEGER NOT NULL CHECK(months IN (1, 3, 6, 12)),
+    price_decimal INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS memberships (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER NOT NULL,
+    plan_id INTEGER,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    price_paid INTEGER NOT NULL,
+    FOREIGN KEY (client_id) REFERENCES Client(id) ON DELETE CASCADE,
+    FOREIGN KEY (plan_id) REFERENCES membership_plans(id) ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE NOT NULL,
+    person_id INTEGER NOT NULL,
+    FOREIGN KEY (person_id) REFERENCES Client(id) ON DELETE CASCADE
+);
+"""
+
+# Covering indexes for the hot read paths:
+# - client_view._latest_membership_end   -> (client_id, end_date)
+# - entry_add.ACTIVE_CLIENTS_QUERY        -> (end_date, start_date, client_id) + Client(full_name NOCASE)
+# - income_summary.show_income_for_period -> (start_date, price_paid)
+# - EntriesViewDialog.refresh             -> entries(date) walked backwards
+# entries(person_id, ...) also keeps ON DELETE CASCADE from scanning all entries.
+_HOT_QUERY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_memberships_client_end ON memberships(client_id, end_date);
+CREATE INDEX IF NOT EXISTS idx_memberships_active ON memberships(end_date, start_date, client_id);
+CREATE INDEX IF NOT EXISTS idx_memberships_start ON memberships(start_date, price_paid);
+CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date);
+CREATE INDEX IF NOT EXISTS idx_entries_person ON entries(person_id, date);
+CREATE INDEX IF NOT EXISTS idx_client_full_name ON Client(full_name COLLATE NOCASE);
+"""
+
+# Client.active_until = latest membership end date, kept current by triggers so
+# "allowed to enter" is a single indexed comparison instead of a GROUP BY.
+_ACTIVE_UNTIL = """
+ALTER TABLE Client ADD COLUMN active_until DATE;
+UPDATE Client SET active_until = (
+    SELECT MAX(date(m.end_date)) FROM memberships m WHERE m.client_id = Client.id
+);
+CREATE INDEX IF NOT EXISTS idx_client_active_until ON Client(active_until);
+-- per-client lookups (triggers, "has a started membership") need start_date covered too
+DROP INDEX IF EXISTS idx_memberships_client_end;
+CREATE INDEX IF NOT EXISTS idx_memberships_client_dates ON memberships(client_id, end_date, start_date);
+
+CREATE TRIGGER IF NOT EXISTS trg_memberships_active_until_ins
+AFTER INSERT ON memberships
+BEGIN
+    UPDATE Client SET active_until = (
+        SELECT MAX(date(end_date)) FROM memberships WHERE client_id = NEW.client_id
+    ) WHERE id = NEW.client_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memberships_active_until_upd
+AFTER UPDATE OF client_id, end_date ON memberships
+BEGIN
+    UPDATE Client SET active_until = (
+        SELECT MAX(date(end_date)) FROM memberships WHERE client_id = OLD.client_id
+    ) WHERE id = OLD.client_id;
+    UPDATE Client SET active_until = (
+        SELECT MAX(date(end_date)) FROM memberships WHERE client_id = NEW.client_id
+    ) WHERE id = NEW.client_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memberships_active_until_del
+AFTER DELETE ON memberships
+BEGIN
+    UPDATE Client SET active_until = (
+        SELECT MAX(date(end_date)) FROM memberships WHERE client_id = OLD.client_id
+    ) WHERE id = OLD.client_id;
+END;
+"""
+
+# Trigram FTS5 index behind the client search box. External content: the text
+# lives in Client, client_fts only stores the index and is kept in sync by triggers.
+_CLIENT_FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_client_fts_ins
+AFTER INSERT ON Client
+BEGIN
+    INSERT INTO client_fts(rowid, full_name, id_card, phone_number)
+    VALUES (NEW.id, NEW.full_name, NEW.id_card, NEW.phone_number);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_fts_del
+AFTER DELETE ON Client
+BEGIN
+    INSERT INTO client_fts(client_fts, rowid, full_name, id_card, phone_number)
+    VALUES ('delete', OLD.id, OLD.full_name, OLD.id_card, OLD.phone_number);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_fts_upd
+AFTER UPDATE OF full_name, id_card, phone_number ON Client
+BEGIN
+    INSERT INTO client_fts(client_fts, rowid, full_name, id_card, phone_number)
+    VALUES ('delete', OLD.id, OLD.full_name, OLD.id_card, OLD.phone_number);
+    INSERT INTO client_fts(rowid, full_name, id_card, phone_number)
+    VALUES (NEW.id, NEW.full_name, NEW.id_card, NEW.phone_number);
+END;
+"""
+
+
+def _client_fts(conn: sqlite3.Connection) -> None:
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS client_fts USING fts5(
+                full_name, id_card, phone_number,
+                content='Client', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 / trigram (< 3.34): the search box keeps using LIKE.
+        return
+    _script(_CLIENT_FTS_TRIGGERS)(conn)
+    conn.execute("INSERT INTO client_fts(client_fts) VALUES ('rebuild')")
+
+
+# id_card / phone_number are INTEGER: leading zeros are lost and prefix search had
+# to CAST the column. The *_text columns keep the digits as typed (the app writes
+# them) and carry prefix indexes. Triggers refill them for any row whose text no
+# longer matches its integer value, e.g. rows written by older versions.
+def _normalized(row: str) -> str:
+    return (f"CAST({row}.id_card_text AS INTEGER) IS {row}.id_card "
+            f"AND CAST({row}.phone_text AS INTEGER) IS {row}.phone_number")
+
+
+_SEARCH_TEXT_COLUMNS = f"""
+ALTER TABLE Client ADD COLUMN id_card_text TEXT;
+ALTER TABLE Client ADD COLUMN phone_text TEXT;
+UPDATE Client SET id_card_text = CAST(id_card AS TEXT), phone_text = CAST(phone_number AS TEXT);
+CREATE INDEX IF NOT EXISTS idx_client_id_card_text ON Client(id_card_text);
+CREATE INDEX IF NOT EXISTS idx_client_phone_text ON Client(phone_text);
+
+CREATE TRIGGER IF NOT EXISTS trg_client_search_text_ins
+AFTER INSERT ON Client
+WHEN NOT ({_normalized("NEW")})
+BEGIN
+    UPDATE Client SET
+        id_card_text = CASE WHEN CAST(NEW.id_card_text AS INTEGER) IS NEW.id_card
+                            THEN NEW.id_card_text ELSE CAST(NEW.id_card AS TEXT) END,
+        phone_text = CASE WHEN CAST(NEW.phone_text AS INTEGER) IS NEW.phone_number
+                          THEN NEW.phone_text ELSE CAST(NEW.phone_number AS TEXT) END
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_search_text_upd
+AFTER UPDATE OF id_card, phone_number, id_card_text, phone_text ON Client
+WHEN NOT ({_normalized("NEW")})
+BEGIN
+    UPDATE Client SET
+        id_card_text = CASE WHEN CAST(NEW.id_card_text AS INTEGER) IS NEW.id_card
+                            THEN NEW.id_card_text ELSE CAST(NEW.id_card AS TEXT) END,
+        phone_text = CASE WHEN CAST(NEW.phone_text AS INTEGER) IS NEW.phone_number
+                          THEN NEW.phone_text ELSE CAST(NEW.phone_number AS TEXT) END
+    WHERE id = NEW.id;
+END;
+"""
+
+# client_fts v2 indexes the text columns. A row is only in the index while its
+# text columns are normalized, so it does not matter in which order the
+# normalizing trigger and these triggers fire.
+_CLIENT_FTS_TEXT_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS trg_client_fts_ins
+AFTER INSERT ON Client
+WHEN {_normalized("NEW")}
+BEGIN
+    INSERT INTO client_fts(rowid, full_name, id_card_text, phone_text)
+    VALUES (NEW.id, NEW.full_name, NEW.id_card_text, NEW.phone_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_fts_del
+AFTER DELETE ON Client
+WHEN {_normalized("OLD")}
+BEGIN
+    INSERT INTO client_fts(client_fts, rowid, full_name, id_card_text, phone_text)
+    VALUES ('delete', OLD.id, OLD.full_name, OLD.id_card_text, OLD.phone_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_fts_upd
+AFTER UPDATE OF full_name, id_card, phone_number, id_card_text, phone_text ON Client
+BEGIN
+    INSERT INTO client_fts(client_fts, rowid, full_name, id_card_text, phone_text)
+    SELECT 'delete', OLD.id, OLD.full_name, OLD.id_card_text, OLD.phone_text
+    WHERE {_normalized("OLD")};
+    INSERT INTO client_fts(rowid, full_name, id_card_text, phone_text)
+    SELECT NEW.id, NEW.full_name, NEW.id_card_text, NEW.phone_text
+    WHERE {_normalized("NEW")};
+END;
+"""
+
+
+def _search_text_columns(conn: sqlite3.Connection) -> None:
+    _script(_SEARCH_TEXT_COLUMNS)(conn)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'client_fts'").fetchone() is None:
+        return
+    conn.execute("DROP TRIGGER IF EXISTS trg_client_fts_ins")
+    conn.execute("DROP TRIGGER IF EXISTS trg_client_fts_del")
+    conn.execute("DROP TRIGGER IF EXISTS trg_client_fts_upd")
+    conn.execute("DROP TABLE client_fts")
+    conn.execute("""
+        CREATE VIRTUAL TABLE client_fts USING fts5(
+            full_name, id_card_text, phone_text,
+            content='Client', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    _script(_CLIENT_FTS_TEXT_TRIGGERS)(conn)
+    conn.execute("INSERT INTO client_fts(client_fts) VALUES ('rebuild')")
+
+
+# Integer day keys next to the text dates (VIRTUAL generated columns, so no write
+# path changes). Indexes move from the text dates to the day keys.
+_DAY_KEYS = f"""
+ALTER TABLE memberships ADD COLUMN start_day INTEGER
+    GENERATED ALWAYS AS ({DAY_KEY_SQL.format(column="start_date")}) VIRTUAL;
+ALTER TABLE memberships ADD COLUMN end_day INTEGER
+    GENERATED ALWAYS AS ({DAY_KEY_SQL.format(column="end_date")}) VIRTUAL;
+ALTER TABLE entries ADD COLUMN day INTEGER
+    GENERATED ALWAYS AS ({DAY_KEY_SQL.format(column="date")}) VIRTUAL;
+
+DROP INDEX IF EXISTS idx_memberships_active;
+DROP INDEX IF EXISTS idx_memberships_client_dates;
+DROP INDEX IF EXISTS idx_memberships_start;
+DROP INDEX IF EXISTS idx_entries_person;
+CREATE INDEX IF NOT EXISTS idx_memberships_active_days ON memberships(end_day, start_day, client_id);
+CREATE INDEX IF NOT EXISTS idx_memberships_client_days ON memberships(client_id, end_day, start_day);
+CREATE INDEX IF NOT EXISTS idx_memberships_start_day ON memberships(start_day, price_paid);
+CREATE INDEX IF NOT EXISTS idx_entries_day ON entries(day);
+CREATE INDEX IF NOT EXISTS idx_entries_person_day ON entries(person_id, day);
+"""
+
+# The main table pages through Client in the order of the clicked column
+# (keyset on (column, id)); these make every sortable column an index walk.
+_SORT_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_client_role ON Client(role);
+CREATE INDEX IF NOT EXISTS idx_client_created_at ON Client(created_at);
+CREATE INDEX IF NOT EXISTS idx_client_picture ON Client(picture);
+"""
+
+# Downscaled copies of each picture (see clientsManagement/pictures.py),
+# keyed by the original's path as stored in Client.picture.
+_PICTURE_SIZES = """
+CREATE TABLE IF NOT EXISTS picture_sizes (
+    picture TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (picture, size)
+) WITHOUT ROWID;
+"""
+
+# Content-addressed picture store (see clientsManagement/face_store.py).
+# refcount = Client rows showing the blob + picture_history rows keeping it,
+# maintained by triggers; replaced pictures are recorded in picture_history
+# instead of being renamed into oldFaces.
+_FACE_STORE = """
+CREATE TABLE IF NOT EXISTS face_blobs (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    bytes INTEGER NOT NULL,
+    source_hash TEXT,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_face_blobs_source ON face_blobs(source_hash);
+
+CREATE TABLE IF NOT EXISTS picture_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER NOT NULL,
+    picture TEXT NOT NULL,
+    replaced_at TEXT NOT NULL,
+    FOREIGN KEY (client_id) REFERENCES Client(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_picture_history_client ON picture_history(client_id, id);
+CREATE INDEX IF NOT EXISTS idx_picture_history_picture ON picture_history(picture);
+
+CREATE TRIGGER IF NOT EXISTS trg_client_picture_ins
+AFTER INSERT ON Client
+WHEN NEW.picture IS NOT NULL
+BEGIN
+    UPDATE face_blobs SET refcount = refcount + 1 WHERE path = NEW.picture;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_picture_del
+AFTER DELETE ON Client
+WHEN OLD.picture IS NOT NULL
+BEGIN
+    UPDATE face_blobs SET refcount = refcount - 1 WHERE path = OLD.picture;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_client_picture_upd
+AFTER UPDATE OF picture ON Client
+WHEN OLD.picture IS NOT NEW.picture
+BEGIN
+    INSERT INTO picture_history (client_id, picture, replaced_at)
+    SELECT OLD.id, OLD.picture, datetime('now','localtime') WHERE OLD.picture IS NOT NULL;
+    UPDATE face_blobs SET refcount = refcount - 1 WHERE path = OLD.picture;
+    UPDATE face_blobs SET refcount = refcount + 1 WHERE path = NEW.picture;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_picture_history_ins
+AFTER INSERT ON picture_history
+BEGIN
+    UPDATE face_blobs SET refcount = refcount + 1 WHERE path = NEW.picture;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_picture_history_del
+AFTER DELETE ON picture_history
+BEGIN
+    UPDATE face_blobs SET refcount = refcount - 1 WHERE path = OLD.picture;
+END;
+"""
+
+# Deleting a plan sets memberships.plan_id to NULL (ON DELETE SET NULL);
+# without an index that is a scan of every membership.
+_PLAN_FK_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_memberships_plan ON memberships(plan_id);
+"""
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "base schema", _script(_BASE_SCHEMA)),
+    Migration(2, "indexes for hot queries", _script(_HOT_QUERY_INDEXES)),
+    Migration(3, "materialized Client.active_until", _script(_ACTIVE_UNTIL)),
+    Migration(4, "client_fts trigram search index", _client_fts),
+    Migration(5, "normalized id_card/phone text search columns", _search_text_columns),
+    Migration(6, "integer day keys for membership and entry dates", _script(_DAY_KEYS)),
+    Migration(7, "indexes for sorting the client table", _script(_SORT_INDEXES)),
+    Migration(8, "picture_sizes for stored thumbnails / previews", _script(_PICTURE_SIZES)),
+    Migration(9, "content-addressed face store with history", _script(_FACE_STORE)),
+    Migration(10, "index for the memberships.plan_id foreign key", _script(_PLAN_FK_INDEX)),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ---------------- Runner ----------------
+def current_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+    return int(row[0])
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Apply every pending step, one transaction per step. Returns the final version."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    version = current_version(conn)
+    applied = False
+    for m in MIGRATIONS:
+        if m.version <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            m.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (m.version, m.description, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            raise RuntimeError(f"Database migration {m.version} ({m.description}) failed: {e}") from e
+        version = m.version
+        applied = True
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return version
+
+
+def migrate(db_path: str | Path) -> int:
+    """Open db_path (creating it if needed) and bring it to LATEST_VERSION."""
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        return apply_migrations(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,372 @@
+# database/repository.py
+"""
+Data access for the dialogs.
+
+Every statement is prepared once per connection and reused, so hot paths do
+not re-parse SQL. Multi-statement operations run inside `transaction()`. The
+SQL lives in module-level constants so tools can time the exact statements
+the app issues. Writes that touch Client rows are announced through
+database.changes once they are committed.
+"""
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from .changes import notifier
+
+# ---------------- SQL ----------------
+LOAD_CLIENT_SQL = """
+SELECT id, full_name, COALESCE(id_card_text, id_card), COALESCE(phone_text, phone_number),
+       role, picture, created_at
+FROM Client WHERE id = ?
+"""
+CLIENT_ACTIVE_UNTIL_SQL = "SELECT active_until FROM Client WHERE id = ?"
+INSERT_CLIENT_SQL = """
+INSERT INTO Client (full_name, id_card, id_card_text, phone_number, phone_text, role, picture, created_at)
+VALUES (?, ?, ?, ?, ?, 'client', ?, ?)
+"""
+UPDATE_CLIENT_SQL = """
+UPDATE Client
+SET full_name = ?, id_card = ?, id_card_text = ?, phone_number = ?, phone_text = ?
+WHERE id = ?
+"""
+SET_CLIENT_PICTURE_SQL = "UPDATE Client SET picture = ? WHERE id = ?"
+SET_CLIENT_ROLE_SQL = "UPDATE Client SET role = ? WHERE id = ?"
+
+PICTURE_SIZES_SQL = "SELECT size, path FROM picture_sizes WHERE picture = ?"
+CLEAR_PICTURE_SIZES_SQL = "DELETE FROM picture_sizes WHERE picture = ?"
+INSERT_PICTURE_SIZE_SQL = "INSERT INTO picture_sizes (picture, size, path) VALUES (?, ?, ?)"
+
+BLOB_FOR_SOURCE_SQL = "SELECT hash, path FROM face_blobs WHERE source_hash = ? LIMIT 1"
+# refcount starts from whatever already points at the path (triggers keep it after that)
+INSERT_FACE_BLOB_SQL = """
+INSERT OR IGNORE INTO face_blobs (hash, path, bytes, source_hash, refcount, created_at)
+VALUES (?, ?, ?, ?,
+        (SELECT COUNT(*) FROM Client WHERE picture = ?)
+        + (SELECT COUNT(*) FROM picture_history WHERE picture = ?),
+        ?)
+"""
+FACE_BLOB_REFCOUNT_SQL = "SELECT refcount FROM face_blobs WHERE hash = ?"
+PICTURE_HISTORY_SQL = "SELECT picture, replaced_at FROM picture_history WHERE client_id = ? ORDER BY id DESC"
+
+LIST_PLANS_SQL = "SELECT id, name, months, price_decimal FROM membership_plans ORDER BY name"
+INSERT_PLAN_SQL = "INSERT INTO membership_plans (name, months, price_decimal) VALUES (?, ?, ?)"
+UPDATE_PLAN_SQL = "UPDATE membership_plans SET name = ?, months = ?, price_decimal = ? WHERE id = ?"
+DELETE_PLAN_SQL = "DELETE FROM membership_plans WHERE id = ?"
+
+INSERT_MEMBERSHIP_SQL = """
+INSERT INTO memberships (client_id, plan_id, start_date, end_date, price_paid)
+VALUES (?, ?, ?, ?, ?)
+"""
+MEMBERSHIP_CLIENT_SQL = "SELECT client_id FROM memberships WHERE id = ?"
+DELETE_MEMBERSHIP_SQL = "DELETE FROM memberships WHERE id = ?"
+INCOME_FOR_PERIOD_SQL = """
+SELECT COALESCE(SUM(price_paid), 0) AS total_income,
+       COUNT(*) AS num_memberships
+FROM memberships
+WHERE start_day BETWEEN ? AND ?
+"""
+
+INSERT_ENTRY_SQL = "INSERT INTO entries (date, person_id) VALUES (datetime('now','localtime'), ?)"
+
+# One row per membership not over by the given day, with its client (see entries_management.checkin_index)
+CHECKIN_MEMBERS_SQL = """
+SELECT c.id, c.full_name, c.id_card_text, c.picture, m.start_day, m.end_day
+FROM memberships m JOIN Client c ON c.id = m.client_id
+WHERE m.end_day >= ?
+"""
+CHECKIN_MEMBER_SQL = """
+SELECT c.id, c.full_name, c.id_card_text, c.picture, m.start_day, m.end_day
+FROM memberships m JOIN Client c ON c.id = m.client_id
+WHERE m.client_id = ? AND m.end_day >= ?
+"""
+CLIENT_BY_CARD_SQL = "SELECT id, full_name, picture, active_until FROM Client WHERE id_card = ?"
+
+
+@dataclass(frozen=True)
+class Plan:
+    id: int
+    name: str
+    months: int
+    price_decimal: int
+
+
+class GymRepository:
+    """Typed methods per entity on top of one QSqlDatabase connection."""
+
+    def __init__(self, db: QSqlDatabase):
+        self._db = db
+        self._statements: dict[str, QSqlQuery] = {}
+        # sql -> [executions, total seconds]; see timings()
+        self._timings: dict[str, list] = {}
+        # notifications held back until the open transaction commits
+        self._deferred: list[tuple[str, list[int]]] | None = None
+
+    # -------- plumbing --------
+    def _exec(self, sql: str, *params) -> tuple[QSqlQuery, bool]:
+        q = self._statements.get(sql)
+        if q is None:
+            q = QSqlQuery(self._db)
+            if not q.prepare(sql):
+                return q, False
+            self._statements[sql] = q
+        for i, value in enumerate(params):
+            q.bindValue(i, value)
+        started = time.perf_counter()
+        ok = q.exec()
+        stat = self._timings.setdefault(sql, [0, 0.0])
+        stat[0] += 1
+        stat[1] += time.perf_counter() - started
+        return q, ok
+
+    def _write(self, sql: str, *params) -> tuple[bool, str]:
+        q, ok = self._exec(sql, *params)
+        err = "" if ok else q.lastError().text()
+        q.finish()
+        return ok, err
+
+    def _notify(self, signal: str, ids: list[int]) -> None:
+        if self._deferred is not None:
+            self._deferred.append((signal, ids))
+        else:
+            getattr(notifier(), signal).emit(ids)
+
+    def _scalar(self, sql: str, *params):
+        q, ok = self._exec(sql, *params)
+        value = q.value(0) if ok and q.next() else None
+        q.finish()   # reset the statement so it does not pin a read snapshot
+        return value
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """BEGIN ... COMMIT, or ROLLBACK if the block raises."""
+        if not self._db.transaction():
+            raise RuntimeError(f"Cannot begin transaction: {self._db.lastError().text()}")
+        self._deferred = []
+        try:
+            yield
+        except BaseException:
+            self._deferred = None
+            self._db.rollback()
+            raise
+        deferred, self._deferred = self._deferred, None
+        if not self._db.commit():
+            err = self._db.lastError().text()
+            self._db.rollback()
+            raise RuntimeError(f"Commit failed: {err}")
+        for signal, ids in deferred:
+            self._notify(signal, ids)
+
+    def timings(self) -> dict[str, tuple[int, float]]:
+        """Executions and total seconds per statement since start-up."""
+        return {sql: (n, total) for sql, (n, total) in self._timings.items()}
+
+    # -------- clients --------
+    def load_client(self, client_id: int) -> dict:
+        q, ok = self._exec(LOAD_CLIENT_SQL, client_id)
+        data = {}
+        if ok and q.next():
+            data = {
+                "id": q.value(0),
+                "full_name": q.value(1),
+                "id_card": q.value(2),
+                "phone_number": q.value(3),
+                "role": q.value(4),
+                "picture": q.value(5),
+                "created_at": q.value(6),
+            }
+        q.finish()
+        return data
+
+    def client_active_until(self, client_id: int) -> str | None:
+        """Latest membership end date (maintained by triggers on memberships)."""
+        val = self._scalar(CLIENT_ACTIVE_UNTIL_SQL, client_id)
+        return str(val) if val else None
+
+    def insert_client(self, full_name: str, id_card: str, phone: str | None,
+                      picture_path: str) -> tuple[bool, str]:
+        # id_card / phone are the digits as typed: the *_text columns keep leading zeros
+        q, ok = self._exec(
+            INSERT_CLIENT_SQL,
+            full_name, int(id_card), id_card,
+            int(phone) if phone else None, phone or None,
+            picture_path, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        err = "" if ok else q.lastError().text()
+        new_id = q.lastInsertId() if ok else None
+        q.finish()
+        if ok and new_id is not None:
+            self._notify("clients_inserted", [int(new_id)])
+        return ok, err
+
+    def _write_client(self, client_id: int, sql: str, *params) -> tuple[bool, str]:
+        ok, err = self._write(sql, *params)
+        if ok:
+            self._notify("clients_changed", [client_id])
+        return ok, err
+
+    def update_client(self, client_id: int, full_name: str, id_card: str,
+                      phone: str | None) -> tuple[bool, str]:
+        return self._write_client(
+            client_id, UPDATE_CLIENT_SQL,
+            full_name, int(id_card), id_card,
+            int(phone) if phone else None, phone or None,
+            client_id,
+        )
+
+    def set_client_picture(self, client_id: int, picture_path: str) -> tuple[bool, str]:
+        return self._write_client(client_id, SET_CLIENT_PICTURE_SQL, picture_path, client_id)
+
+    def set_client_role(self, client_id: int, role: str) -> tuple[bool, str]:
+        return self._write_client(client_id, SET_CLIENT_ROLE_SQL, role, client_id)
+
+    # -------- pictures --------
+    def picture_sizes(self, picture: str) -> dict[int, str]:
+        """{size: path} of the stored downscaled copies of a picture."""
+        q, ok = self._exec(PICTURE_SIZES_SQL, picture)
+        sizes = {}
+        while ok and q.next():
+            sizes[int(q.value(0))] = q.value(1)
+        q.finish()
+        return sizes
+
+    def set_picture_sizes(self, picture: str, sizes: dict[int, str]) -> tuple[bool, str]:
+        """Replace the recorded copies of a picture (run inside transaction())."""
+        ok, err = self._write(CLEAR_PICTURE_SIZES_SQL, picture)
+        for size, path in sizes.items():
+            if not ok:
+                break
+            ok, err = self._write(INSERT_PICTURE_SIZE_SQL, picture, size, path)
+        return ok, err
+
+    def blob_for_source(self, source_hash: str) -> tuple[str, str] | None:
+        """(hash, path) of a stored blob made from a file with this sha256."""
+        q, ok = self._exec(BLOB_FOR_SOURCE_SQL, source_hash)
+        row = (q.value(0), q.value(1)) if ok and q.next() else None
+        q.finish()
+        return row
+
+    def add_face_blob(self, blob_hash: str, path: str, size_bytes: int,
+                      source_hash: str | None) -> tuple[bool, str]:
+        """Record a stored blob (no-op if it is already known)."""
+        return self._write(INSERT_FACE_BLOB_SQL, blob_hash, path, size_bytes, source_hash, path, path,
+                           datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    def face_blob_refcount(self, blob_hash: str) -> int | None:
+        """Rows using a stored blob; 0 if it is not recorded, None if the read failed."""
+        q, ok = self._exec(FACE_BLOB_REFCOUNT_SQL, blob_hash)
+        try:
+            if not ok:
+                return None
+            return int(q.value(0)) if q.next() else 0
+        finally:
+            q.finish()   # failed or not, release the statement and its read snapshot
+
+    def picture_history(self, client_id: int) -> list[tuple[str, str]]:
+        """(picture, replaced_at) of a client's previous pictures, newest first."""
+        q, ok = self._exec(PICTURE_HISTORY_SQL, client_id)
+        rows = []
+        while ok and q.next():
+            rows.append((q.value(0), q.value(1)))
+        q.finish()
+        return rows
+
+    # -------- membership plans --------
+    def list_plans(self) -> list[Plan] | None:
+        q, ok = self._exec(LIST_PLANS_SQL)
+        try:
+            if not ok:
+                return None
+            plans = []
+            while q.next():
+                plans.append(Plan(q.value(0), q.value(1), q.value(2), q.value(3)))
+            return plans
+        finally:
+            q.finish()
+
+    def insert_plan(self, name: str, months: int, price_decimal: int) -> tuple[bool, str]:
+        return self._write(INSERT_PLAN_SQL, name, months, price_decimal)
+
+    def update_plan(self, plan_id: int, name: str, months: int, price_decimal: int) -> tuple[bool, str]:
+        return self._write(UPDATE_PLAN_SQL, name, months, price_decimal, plan_id)
+
+    def delete_plan(self, plan_id: int) -> tuple[bool, str]:
+        return self._write(DELETE_PLAN_SQL, plan_id)
+
+    # -------- memberships --------
+    def add_membership(self, client_id: int, plan_id: int, start_date: str, end_date: str,
+                       price_paid: int) -> tuple[bool, str]:
+        # triggers move Client.active_until, which the main table shows
+        return self._write_client(client_id, INSERT_MEMBERSHIP_SQL,
+                                  client_id, plan_id, start_date, end_date, price_paid)
+
+    def delete_memberships(self, membership_ids: list[int]) -> tuple[bool, str]:
+        """Delete memberships; call inside transaction() so their clients are announced once, on commit."""
+        for membership_id in membership_ids:
+            client_id = self._scalar(MEMBERSHIP_CLIENT_SQL, membership_id)
+            if client_id is None:
+                continue   # already gone
+            ok, err = self._write_client(int(client_id), DELETE_MEMBERSHIP_SQL, membership_id)
+            if not ok:
+                return ok, err
+        return True, ""
+
+    def income_for_period(self, start_day: int, end_day: int) -> tuple[int, int] | None:
+        """(total income, memberships sold) for memberships starting in [start_day, end_day]."""
+        q, ok = self._exec(INCOME_FOR_PERIOD_SQL, start_day, end_day)
+        result = (q.value(0) or 0, q.value(1) or 0) if ok and q.next() else None
+        q.finish()
+        return result
+
+    # -------- entries --------
+    def add_entry(self, client_id: int) -> tuple[bool, str]:
+        return self._write(INSERT_ENTRY_SQL, client_id)
+
+    # -------- check-in --------
+    def checkin_members(self, from_day: int, client_id: int | None = None) -> list[tuple] | None:
+        """(id, full_name, id_card_text, picture, start_day, end_day) per membership ending on/after from_day."""
+        if client_id is None:
+            q, ok = self._exec(CHECKIN_MEMBERS_SQL, from_day)
+        else:
+            q, ok = self._exec(CHECKIN_MEMBER_SQL, client_id, from_day)
+        try:
+            if not ok:
+                return None
+            rows = []
+            while q.next():
+                rows.append(tuple(q.value(i) for i in range(6)))
+            return rows
+        finally:
+            q.finish()
+
+    def client_by_card(self, card: int) -> tuple[int, str, str, str] | None:
+        """(id, full_name, picture, active_until) of the client with this id card number."""
+        q, ok = self._exec(CLIENT_BY_CARD_SQL, card)
+        row = (q.value(0), q.value(1), q.value(2), q.value(3)) if ok and q.next() else None
+        q.finish()
+        return row
+
+
+_REPOSITORIES: dict[str, GymRepository] = {}
+
+
+def repository_for(db: QSqlDatabase) -> GymRepository:
+    """The shared repository (and statement cache) of a connection."""
+    name = db.connectionName()
+    repo = _REPOSITORIES.get(name)
+    if repo is None:
+        repo = _REPOSITORIES[name] = GymRepository(db)
+    return repo
+
+
+def release_repository(name: str) -> None:
+    """Forget the repository of a connection about to be removed, with its prepared statements."""
+    repo = _REPOSITORIES.pop(name, None)
+    if repo is not None:
+        repo._statements.clear()
+        repo._db = QSqlDatabase()
@@ -0,0 +1,97 @@
+# database/search.py
+"""Helpers that turn what staff type into index-friendly (sargable) predicates."""
+from __future__ import annotations
+import string
+from typing import Callable
+
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)  # SQLite NOCASE folds ASCII only
+
+
+def prefix_range(prefix: str, nocase: bool = False) -> tuple[str, str]:
+    """[lo, hi) bounds so that `col >= lo AND col < hi` is a prefix match on col.
+
+    With nocase (the column compares COLLATE NOCASE) the bounds are built from
+    the folded prefix: 'Z' must give ['z', '{'), not ['Z', '['), which NOCASE
+    sees as empty because it folds 'Z' to 'z' > '['.
+    """
+    if nocase:
+        prefix = prefix.translate(_NOCASE)
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def int_prefix_ranges(prefix: str, max_value: int) -> list[tuple[int, int]]:
+    """
+    Inclusive integer ranges whose decimal form starts with `prefix`.
+    '12' with max_value 1300 -> (12, 12), (120, 129), (1200, 1299).
+    """
+    if not prefix.isdigit() or (prefix.startswith("0") and prefix != "0"):
+        return []
+    lo = hi = int(prefix)
+    ranges = []
+    while lo <= max_value:
+        ranges.append((lo, min(hi, max_value)))
+        if lo == 0:
+            break   # no other number starts with a 0
+        lo, hi = lo * 10, hi * 10 + 9
+    return ranges
+
+
+# ---------------- Main window search filter ----------------
+# Conditions are (sql, params) pairs: what staff type is always bound, never
+# formatted into the SQL.
+Condition = tuple[str, list]
+
+# Columns indexed by the client_fts trigram table (see database/migrations.py)
+FTS_COLUMNS = {"full_name": "full_name", "id_card": "id_card_text", "phone_number": "phone_text"}
+FTS_MIN_CHARS = 3   # trigrams cannot match anything shorter
+
+# Digits as typed (leading zeros kept), with prefix indexes
+TEXT_SEARCH_COLUMNS = {"id_card": "id_card_text", "phone_number": "phone_text"}
+
+NO_MATCH: Condition = ("1=0", [])
+
+
+def escape_like(s: str) -> str:
+    """Escape \\, % and _ for a LIKE pattern used with ESCAPE '\\'."""
+    return s.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+
+
+def fts_condition(column: str, text: str) -> Condition:
+    """Substring match on one column through the client_fts index."""
+    phrase = '"' + text.replace('"', '""') + '"'
+    return "id IN (SELECT rowid FROM client_fts WHERE client_fts MATCH ?)", [f"{column} : {phrase}"]
+
+
+def prefix_condition(column: str, text: str, collate: str = "") -> Condition:
+    """Prefix match as a range so the column's index is used."""
+    lo, hi = prefix_range(text, nocase="NOCASE" in collate)
+    return f"{column} >= ?{collate} AND {column} < ?{collate}", [lo, hi]
+
+
+def id_prefix_condition(text: str, max_id: int) -> Condition:
+    """Ids whose digits start with text, as rowid ranges instead of CAST(id AS TEXT) LIKE."""
+    ranges = int_prefix_ranges(text, max_id)
+    if not ranges:
+        return NO_MATCH
+    return " OR ".join("id BETWEEN ? AND ?" for _ in ranges), [v for r in ranges for v in r]
+
+
+def client_filter(column: str | None, text: str, has_fts: bool, max_id: Callable[[], int]) -> Condition:
+    """
+    WHERE condition on Client for the search box (one column, as typed).
+
+    Names, id cards and phones match anywhere from FTS_MIN_CHARS characters on
+    (trigram index); shorter text matches the start only, as an index range,
+    since a 1-2 character substring would scan the whole table.
+    """
+    if not column or not text:
+        return "", []
+    if column == "id":
+        return id_prefix_condition(text, max_id()) if text.isdigit() else NO_MATCH
+    if column in FTS_COLUMNS and has_fts and len(text) >= FTS_MIN_CHARS:
+        return fts_condition(FTS_COLUMNS[column], text)
+    if column == "full_name" and has_fts:
+        return prefix_condition(column, text, collate=" COLLATE NOCASE")
+    if column in TEXT_SEARCH_COLUMNS:
+        return prefix_condition(TEXT_SEARCH_COLUMNS[column], text)
+    return f"{column} LIKE ? ESCAPE '\\'", [f"%{escape_like(text)}%"]
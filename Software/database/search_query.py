@@ -0,0 +1,224 @@
+# database/search_query.py
+"""
+Structured search for the main window, e.g.
+
+    role:coach name:ali created:>=2025-01 status:expired
+
+Terms are ANDed. Words without a field search the column picked in the combo
+box, exactly like the plain search. Every term compiles to a sargable,
+parameterized condition (see database/search.py), so the planner can use the
+role / created_at / active_until / FTS indexes and nothing typed ends up in
+the SQL text.
+
+Fields:
+    name, card, phone       substring (FTS) or prefix match, as in the search box
+    role                    role:coach, role:coach,owner
+    id                      id:42, id:>=1000, id:100..200
+    created, until          created:2025, created:>=2025-01, until:2025-01-01..2025-03
+    status                  status:active | expired | never | inactive
+                            (also "allowed" / "not allowed", as shown in the table)
+
+With "Status" picked in the combo box, bare words are a status; with "Created
+At" / "Membership Ends", a typed date (2025, 2025-01, 2025-01-31) is a period.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+
+from .search import Condition, NO_MATCH, client_filter
+
+FIELDS = {
+    "name": "full_name", "full_name": "full_name",
+    "card": "id_card", "id_card": "id_card",
+    "phone": "phone_number", "phone_number": "phone_number",
+    "role": "role",
+    "id": "id",
+    "created": "created_at", "created_at": "created_at",
+    "until": "active_until", "end": "active_until", "active_until": "active_until",
+    "status": "status",
+}
+FIELD_NAMES = ("name", "card", "phone", "role", "id", "created", "until", "status")
+ROLES = ("owner", "client", "coach")
+# status -> words staff may type (a unique prefix is enough)
+STATUSES = {
+    "active": ("active", "allowed", "allowed to enter"),
+    "expired": ("expired",),
+    "never": ("never", "none"),
+    "inactive": ("inactive", "not allowed"),   # expired or never
+}
+
+_TOKEN = re.compile(r'(?:(?P<field>[A-Za-z_]+):)?(?:"(?P<quoted>[^"]*)"?|(?P<word>\S+))')
+_DATE = re.compile(r"^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?$")
+_OPS = (">=", "<=", ">", "<", "=")
+
+
+class QueryError(ValueError):
+    """The search text is not a valid query; the message is shown to staff."""
+
+
+@dataclass(frozen=True)
+class Term:
+    field: str | None   # a FIELDS value, or None for a bare word
+    value: str
+
+
+def parse(text: str) -> list[Term]:
+    terms = []
+    for m in _TOKEN.finditer(text):
+        value = m.group("quoted") if m.group("quoted") is not None else m.group("word") or ""
+        name = m.group("field")
+        if name is None:
+            if value:
+                terms.append(Term(None, value))
+            continue
+        field = FIELDS.get(name.lower())
+        if field is None:
+            raise QueryError(f"Unknown search field '{name}:' (use {', '.join(FIELD_NAMES)})")
+        if not value:
+            raise QueryError(f"'{name}:' needs a value")
+        terms.append(Term(field, value))
+    return terms
+
+
+# ---------------- Values ----------------
+def _period(text: str) -> tuple[str, str]:
+    """'2025' / '2025-01' / '2025-01-31' -> [first day, first day after) as ISO dates."""
+    m = _DATE.match(text)
+    if not m:
+        raise QueryError(f"'{text}' is not a date (use YYYY, YYYY-MM or YYYY-MM-DD)")
+    y, mo, d = int(m.group(1)), m.group(2), m.group(3)
+    try:
+        if d is not None:
+            start = date(y, int(mo), int(d))
+            end = date.fromordinal(start.toordinal() + 1)
+        elif mo is not None:
+            start = date(y, int(mo), 1)
+            end = date(y + 1, 1, 1) if start.month == 12 else date(y, start.month + 1, 1)
+        else:
+            start, end = date(y, 1, 1), date(y + 1, 1, 1)
+    except ValueError:
+        raise QueryError(f"'{text}' is not a valid date") from None
+    return start.isoformat(), end.isoformat()
+
+
+def _int(text: str) -> int:
+    if not text.isdigit():
+        raise QueryError(f"'{text}' is not a number")
+    return int(text)
+
+
+def _split_op(value: str) -> tuple[str, str]:
+    for op in _OPS:
+        if value.startswith(op):
+            return op, value[len(op):]
+    return "", value
+
+
+def _range_condition(column: str, value: str, bounds: Callable[[str], tuple]) -> Condition:
+    """
+    Comparison on an ordered column. bounds(text) gives the [lo, hi) range the
+    text stands for (one value for ids, a whole month for '2025-01'), so
+    '<=2025-01' includes all of January.
+    """
+    if ".." in value:
+        a, b = value.split("..", 1)
+        conds, params = [], []
+        if a:
+            conds.append(f"{column} >= ?")
+            params.append(bounds(a)[0])
+        if b:
+            conds.append(f"{column} < ?")
+            params.append(bounds(b)[1])
+        if not conds:
+            raise QueryError(f"'{value}' needs at least one bound")
+        return " AND ".join(conds), params
+    op, text = _split_op(value)
+    lo, hi = bounds(text)
+    if op in ("", "="):
+        return f"{column} >= ? AND {column} < ?", [lo, hi]
+    return {
+        ">=": (f"{column} >= ?", [lo]),
+        ">": (f"{column} >= ?", [hi]),
+        "<": (f"{column} < ?", [lo]),
+        "<=": (f"{column} < ?", [hi]),
+    }[op]
+
+
+def _id_bounds(text: str) -> tuple[int, int]:
+    n = _int(text)
+    return n, n + 1
+
+
+# ---------------- Terms ----------------
+def _term_condition(term: Term, has_fts: bool, max_id: Callable[[], int], today: str) -> Condition:
+    field, value = term.field, term.value
+    if field in ("full_name", "id_card", "phone_number"):
+        if field != "full_name" and not value.isdigit():
+            raise QueryError(f"'{value}' is not a number")
+        return client_filter(field, value, has_fts, max_id)
+    if field == "role":
+        roles = [r.strip().lower() for r in value.split(",") if r.strip()]
+        bad = [r for r in roles if r not in ROLES]
+        if bad or not roles:
+            raise QueryError(f"Unknown role '{','.join(bad) or value}' (use {', '.join(ROLES)})")
+        return f"role IN ({', '.join('?' * len(roles))})", roles
+    if field == "id":
+        return _range_condition("id", value, _id_bounds)
+    if field in ("created_at", "active_until"):
+        return _range_condition(field, value, _period)
+    if field == "status":
+        return _status_condition(value, today)
+    raise QueryError(f"Unknown search field '{field}'")
+
+
+def _status_condition(value: str, today: str) -> Condition:
+    text = " ".join(value.lower().split())
+    exact = {s for s, words in STATUSES.items() if text in words}
+    candidates = exact or {s for s, words in STATUSES.items() if any(w.startswith(text) for w in words)}
+    if len(candidates) != 1:
+        raise QueryError(f"Unknown status '{value}' (use {', '.join(STATUSES)})")
+    status = candidates.pop()
+    # same rule as ClientInfoDialog: allowed while the latest end is today or later
+    return {
+        "active": ("active_until >= ?", [today]),
+        "expired": ("active_until < ?", [today]),
+        "never": ("active_until IS NULL", []),
+        "inactive": ("active_until < ? OR active_until IS NULL", [today]),
+    }[status]
+
+
+def _bare_condition(column: str | None, text: str, has_fts: bool,
+                    max_id: Callable[[], int], today: str) -> Condition:
+    """Words without a field: the combo box column, as in the plain search."""
+    if column == "status":
+        return _status_condition(text, today)
+    if column in ("created_at", "active_until") and _DATE.match(text):
+        return _range_condition(column, text, _period)
+    return client_filter(column, text, has_fts, max_id)
+
+
+def compile_query(text: str, default_column: str | None, has_fts: bool,
+                  max_id: Callable[[], int], today: date | None = None) -> Condition:
+    """(WHERE condition, params) for the search text; ("", []) matches everything."""
+    terms = parse(text)
+    today_iso = (today or date.today()).isoformat()
+    conds, params = [], []
+    bare = " ".join(t.value for t in terms if t.field is None)
+    if bare:
+        sql, p = _bare_condition(default_column, bare, has_fts, max_id, today_iso)
+        if (sql, p) == NO_MATCH:
+            return NO_MATCH
+        if sql:
+            conds.append(f"({sql})")
+            params += p
+    for term in terms:
+        if term.field is None:
+            continue
+        sql, p = _term_condition(term, has_fts, max_id, today_iso)
+        if (sql, p) == NO_MATCH:
+            return NO_MATCH
+        conds.append(f"({sql})")
+        params += p
+    return " AND ".join(conds), params
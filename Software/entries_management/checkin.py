@@ -0,0 +1,159 @@
+# entries_management/checkin.py
+"""
+Check-in desk: scan (or type) a card, get a green or red answer.
+
+A barcode / RFID reader in keyboard mode types the card number followed by
+Enter into the one field, which keeps the focus. The card is resolved in the
+ActiveMemberIndex, the entry is inserted, and the result (with the member's
+face) is shown; no query runs for an allowed member besides the INSERT. A
+second scan of the same card within DOUBLE_SCAN_S is not counted twice.
+"""
+from __future__ import annotations
+import time
+from pathlib import Path
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont, QPixmap
+from PyQt6.QtSql import QSqlDatabase
+from PyQt6.QtWidgets import QDialog, QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout
+
+from clientsManagement.pictures import PREVIEW_SIZE, derivative_path
+from clientsManagement.pixmap_cache import pixmap_cache
+from database.days import key_date, today_key
+from database.repository import repository_for
+from .checkin_index import active_member_index, normalize_card
+
+FACE_PX = 160
+DOUBLE_SCAN_S = 30
+RESULT_CLEAR_MS = 6000   # back to "scan a card" after this long
+
+GREEN = "background: #0a7b34; color: white;"
+RED = "background: #b00020; color: white;"
+IDLE = "background: #444; color: #ddd;"
+
+
+class CheckInDialog(QDialog):
+    def __init__(self, db: QSqlDatabase, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Check-in")
+        self.resize(520, 420)
+        self._repo = repository_for(db)
+        self._index = active_member_index(db)
+        self._recent: dict[int, float] = {}   # client id -> monotonic time of their check-in
+
+        v = QVBoxLayout(self)
+        self.card = QLineEdit(self)
+        self.card.setPlaceholderText("Scan or type a card number, then Enter")
+        font = QFont(self.card.font())
+        font.setPointSizeF(font.pointSizeF() * 1.6)
+        self.card.setFont(font)
+        v.addWidget(self.card)
+
+        self.panel = QLabel(self)
+        self.panel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.panel.setWordWrap(True)
+        big = QFont(font)
+        big.setBold(True)
+        self.panel.setFont(big)
+        self.panel.setMinimumHeight(90)
+
+        self.face = QLabel(self)
+        self.face.setFixedSize(FACE_PX, FACE_PX)
+        self.face.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.face.setStyleSheet("background: #222; color: #bbb;")
+        self.name = QLabel(self)
+        self.name.setFont(big)
+        self.name.setWordWrap(True)
+        who = QHBoxLayout()
+        who.addWidget(self.face, 0)
+        who.addWidget(self.name, 1)
+
+        self.timing = QLabel(self)
+        self.timing.setStyleSheet("color: gray;")
+        btn_close = QPushButton("Close")
+        btn_close.setAutoDefault(False)   # Enter belongs to the card field
+        btn_close.clicked.connect(self.reject)
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.timing, 1)
+        bottom.addWidget(btn_close, 0)
+
+        v.addWidget(self.panel)
+        v.addLayout(who, 1)
+        v.addLayout(bottom)
+
+        self._clear_timer = QTimer(self)
+        self._clear_timer.setSingleShot(True)
+        self._clear_timer.timeout.connect(self._show_idle)
+        self.card.returnPressed.connect(self._on_scan)
+        self._show_idle()
+        self.timing.setText(f"{len(self._index)} cards with a membership loaded")
+
+    # ---- scanning ----
+    def _on_scan(self):
+        started = time.perf_counter()
+        card = normalize_card(self.card.text())
+        self.card.clear()
+        if not card:
+            return
+        self._check_in(card)
+        self.timing.setText(f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        self._clear_timer.start(RESULT_CLEAR_MS)
+
+    def _check_in(self, card: str):
+        today = today_key()
+        member = self._index.lookup(card)
+        if member is None:
+            self._show_unknown(card)
+            return
+        if not member.active_on(today):
+            start = member.next_start(today)
+            why = (f"Membership starts {key_date(start).isoformat()}" if start is not None
+                   else f"Membership ended {key_date(member.last_end()).isoformat()}")
+            self._show(RED, why, member.full_name, member.picture)
+            return
+
+        now = time.monotonic()
+        last = self._recent.get(member.id)
+        if last is not None and now - last < DOUBLE_SCAN_S:
+            self._show(GREEN, "Already checked in", member.full_name, member.picture)
+            return
+        ok, err = self._repo.add_entry(member.id)
+        if not ok:
+            self._show(RED, f"Entry not saved: {err}", member.full_name, member.picture)
+            return
+        self._recent[member.id] = now
+        self._show(GREEN, "Welcome!", member.full_name, member.picture)
+
+    def _show_unknown(self, card: str):
+        # not in the index: no membership left; one indexed lookup for the name
+        client = self._repo.client_by_card(int(card)) if card.isascii() and card.isdigit() else None
+        if client is None:
+            self._show(RED, f"Unknown card {card}", "", "")
+            return
+        _, name, picture, active_until = client
+        why = f"Membership ended {active_until}" if active_until else "No membership"
+        self._show(RED, why, name or "", picture or "")
+
+    # ---- display ----
+    def _show(self, style: str, message: str, name: str, picture: str):
+        self.panel.setStyleSheet(style)
+        self.panel.setText(message)
+        self.name.setText(name)
+        self._set_face(picture)
+        self.card.setFocus()
+
+    def _show_idle(self):
+        self._show(IDLE, "Scan a card", "", "")
+
+    def _set_face(self, picture: str):
+        self.face.setPixmap(QPixmap())
+        self.face.setText("")
+        if not picture:
+            return
+        small = derivative_path(Path(picture), PREVIEW_SIZE)
+        src = small if small.exists() else picture
+        pm = pixmap_cache().pixmap(src, self.face.size(), self.devicePixelRatioF())
+        if pm.isNull():
+            self.face.setText("No picture")
+        else:
+            self.face.setPixmap(pm)
@@ -0,0 +1,105 @@
+# entries_management/checkin_index.py
+"""
+In-memory index of members for the check-in desk (GUI thread).
+
+A scanned card is looked up in a dict instead of running
+ACTIVE_CLIENTS_QUERY. The index holds every client with a membership that
+had not ended on the day it was loaded, with those memberships' day ranges;
+whether one covers today is decided at lookup time, so the index stays
+right across midnight without a reload (a membership starting tomorrow is
+already in it).
+
+It is loaded once, then kept current from database.changes: each changed
+client (a membership added, the card or picture edited) is re-read on its
+own and patched in; nothing is rebuilt.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtSql import QSqlDatabase
+
+from database.changes import notifier
+from database.days import today_key
+from database.repository import repository_for
+
+
+@dataclass(frozen=True)
+class Member:
+    id: int
+    full_name: str
+    card: str
+    picture: str
+    periods: tuple[tuple[int, int], ...]   # (start_day, end_day) per membership
+
+    def active_on(self, day: int) -> bool:
+        return any(start <= day <= end for start, end in self.periods)
+
+    def next_start(self, day: int) -> int | None:
+        """First day of a membership that has not started yet."""
+        return min((start for start, _ in self.periods if start > day), default=None)
+
+    def last_end(self) -> int:
+        return max(end for _, end in self.periods)
+
+
+def normalize_card(text: str) -> str:
+    """Cards compare as numbers, like Client.id_card: a reader's "00123" is card 123."""
+    text = text.strip()
+    return str(int(text)) if text.isascii() and text.isdigit() else text
+
+
+class ActiveMemberIndex(QObject):
+    def __init__(self, db: QSqlDatabase, parent=None):
+        super().__init__(parent)
+        self._repo = repository_for(db)
+        self._by_card: dict[str, Member] = {}
+        self._card_of: dict[int, str] = {}   # client id -> its key in _by_card
+        self._since = today_key()
+        self._add_rows(self._repo.checkin_members(self._since) or [])
+        notifier().clients_changed.connect(self._refresh)
+
+    def lookup(self, card: str) -> Member | None:
+        return self._by_card.get(normalize_card(card))
+
+    def __len__(self) -> int:
+        return len(self._by_card)
+
+    # ---- upkeep ----
+    def _refresh(self, client_ids: list[int]):
+        for client_id in client_ids:
+            rows = self._repo.checkin_members(self._since, client_id)
+            if rows is None:
+                continue   # read failed: keep what we had
+            self._remove(client_id)
+            self._add_rows(rows)
+
+    def _remove(self, client_id: int):
+        member = self._by_card.get(self._card_of.pop(client_id, ""))
+        if member is not None and member.id == client_id:   # the card may belong to someone else now
+            del self._by_card[member.card]
+
+    def _add_rows(self, rows: list[tuple]):
+        grouped: dict[int, list[tuple]] = {}
+        for row in rows:
+            grouped.setdefault(int(row[0]), []).append(row)
+        for client_id, memberships in grouped.items():
+            _, name, card, picture, _, _ = memberships[0]
+            card = normalize_card(card or "")
+            if not card:
+                continue
+            self._by_card[card] = Member(client_id, name or "", card, picture or "",
+                                         tuple((int(r[4]), int(r[5])) for r in memberships))
+            self._card_of[client_id] = card
+
+
+_INDEXES: dict[str, ActiveMemberIndex] = {}
+
+
+def active_member_index(db: QSqlDatabase) -> ActiveMemberIndex:
+    """The shared index for a connection, loaded on first use."""
+    name = db.connectionName()
+    index = _INDEXES.get(name)
+    if index is None:
+        index = _INDEXES[name] = ActiveMemberIndex(db)
+    return index
@@ -4,13 +4,25 @@ from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTab
 from PyQt6.QtSql import QSqlQueryModel, QSqlDatabase
 from .entry_add import AddEntryDialog
 
+# Join with Client for name; keep entries even if client deleted
+ENTRIES_QUERY = """
+SELECT e.id            AS "ID",
+       e.date          AS "Date",
+       e.person_id     AS "Client ID",
+       COALESCE(c.full_name, '(deleted)') AS "Client Name"
+FROM entries e
+LEFT JOIN Client c ON c.id = e.person_id
+ORDER BY e.date DESC, e.id DESC;
+"""
+
 
 class EntriesViewDialog(QDialog):
-    def __init__(self, db: QSqlDatabase, parent=None):
+    def __init__(self, db: QSqlDatabase, parent=None, read_db: QSqlDatabase | None = None):
         super().__init__(parent)
         self.setWindowTitle("Gym Entries")
         self.resize(780, 500)
         self._db = db
+        self._read_db = read_db or db   # listing can run on a reader so it never blocks inserts
 
         layout = QVBoxLayout(self)
 
@@ -41,19 +53,15 @@ class EntriesViewDialog(QDialog):
         self.refresh()
 
     def refresh(self):
-        # Join with Client for name; keep entries even if client deleted
-        sql = """
-        SELECT e.id            AS "ID",
-               e.date          AS "Date",
-               e.person_id     AS "Client ID",
-               COALESCE(c.full_name, '(deleted)') AS "Client Name"
-        FROM entries e
-        LEFT JOIN Client c ON c.id = e.person_id
-        ORDER BY e.date DESC, e.id DESC;
-        """
-        self.model.setQuery(sql, self._db)
+        self.model.setQuery(ENTRIES_QUERY, self._read_db)
         self.view.resizeColumnsToContents()
 
+    def done(self, result: int):
+        # let go of the reader: ConnectionManager.close() removes it at shutdown
+        self.model.clear()
+        self._read_db = self._db
+        super().done(result)
+
     def _add_entry(self):
         dlg = AddEntryDialog(self._db, parent=self)
         if dlg.exec():
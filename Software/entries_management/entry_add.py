@@ -1,4 +1,6 @@
 # entries_management/entry_add.py
+from datetime import date
+
 from PyQt6.QtCore import Qt, QSortFilterProxyModel
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QTableView,
@@ -6,15 +8,39 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtSql import QSqlQueryModel, QSqlDatabase, QSqlQuery
 
+from database.search import prefix_range
+from database.days import day_key
+from database.repository import repository_for
+
 # Clients allowed to enter today:
-# - Have at least one membership where today is between start_date and end_date (inclusive)
-# - We group by client to avoid duplicates if multiple memberships overlap
+# - Client.active_until (latest membership end, kept by triggers) is today or later: index range scan
+# - and one of their memberships covers today (skips memberships booked for the future),
+#   checked on the integer day keys through idx_memberships_client_days
 ACTIVE_CLIENTS_QUERY = """
 SELECT c.id, c.full_name
 FROM Client c
-JOIN memberships m ON m.client_id = c.id
-WHERE date('now') BETWEEN date(m.start_date) AND date(m.end_date)
-GROUP BY c.id
+WHERE c.active_until >= :today
+  AND EXISTS (
+      SELECT 1 FROM memberships m
+      WHERE m.client_id = c.id
+        AND m.end_day >= :today_day
+        AND m.start_day <= :today_day
+  )
+ORDER BY c.full_name COLLATE NOCASE;
+"""
+
+# Same clients, narrowed to an id card / phone prefix (index range scans on the *_text columns)
+ACTIVE_CLIENTS_BY_NUMBER_QUERY = """
+SELECT c.id, c.full_name
+FROM Client c
+WHERE c.active_until >= :today
+  AND ((c.id_card_text >= :lo AND c.id_card_text < :hi) OR (c.phone_text >= :lo AND c.phone_text < :hi))
+  AND EXISTS (
+      SELECT 1 FROM memberships m
+      WHERE m.client_id = c.id
+        AND m.end_day >= :today_day
+        AND m.start_day <= :today_day
+  )
 ORDER BY c.full_name COLLATE NOCASE;
 """
 
@@ -38,9 +64,8 @@ class AddEntryDialog(QDialog):
 
         # Base model with allowed clients
         self.base = QSqlQueryModel(self)
-        self.base.setQuery(ACTIVE_CLIENTS_QUERY, self._db)
-        self.base.setHeaderData(0, Qt.Orientation.Horizontal, "ID")
-        self.base.setHeaderData(1, Qt.Orientation.Horizontal, "Full Name")
+        self._number_prefix: str | None = None
+        self._load_clients(None)
 
         # Filter by name (case-insensitive)
         self.proxy = QSortFilterProxyModel(self)
@@ -65,7 +90,31 @@ class AddEntryDialog(QDialog):
         v.addWidget(btns)
 
         # Wire search
-        self.search.textChanged.connect(self.proxy.setFilterFixedString)
+        self.search.textChanged.connect(self._on_search)
+
+    def _load_clients(self, number_prefix: str | None):
+        today = date.today()
+        q = QSqlQuery(self._db)
+        q.prepare(ACTIVE_CLIENTS_BY_NUMBER_QUERY if number_prefix else ACTIVE_CLIENTS_QUERY)
+        q.bindValue(":today", today.isoformat())
+        q.bindValue(":today_day", day_key(today))
+        if number_prefix:
+            lo, hi = prefix_range(number_prefix)
+            q.bindValue(":lo", lo)
+            q.bindValue(":hi", hi)
+        q.exec()
+        self.base.setQuery(q)
+        self.base.setHeaderData(0, Qt.Orientation.Horizontal, "ID")
+        self.base.setHeaderData(1, Qt.Orientation.Horizontal, "Full Name")
+        self._number_prefix = number_prefix
+
+    def _on_search(self, text: str):
+        # Digits: id card / phone prefix in SQL. Anything else: filter names client-side.
+        txt = text.strip()
+        number_prefix = txt if txt.isdigit() else None
+        if number_prefix != self._number_prefix:
+            self._load_clients(number_prefix)
+        self.proxy.setFilterFixedString("" if number_prefix else txt)
 
     def _current_client_id(self) -> int | None:
         idx = self.view.currentIndex()
@@ -80,12 +129,10 @@ class AddEntryDialog(QDialog):
             QMessageBox.warning(self, "Select client", "Please select a client from the list.")
             return
 
-        # Insert entry for *today* (DATE type). Use date('now') from SQLite.
-        q = QSqlQuery(self._db)
-        q.prepare("INSERT INTO entries (date, person_id) VALUES (datetime('now','localtime'), ?);")
-        q.addBindValue(int(client_id))
-        if not q.exec():
-            QMessageBox.critical(self, "Database error", q.lastError().text())
+        # Insert entry for *today*, local time (entries.day is generated from it)
+        ok, err = repository_for(self._db).add_entry(int(client_id))
+        if not ok:
+            QMessageBox.critical(self, "Database error", err)
             return
 
         self.accept()
@@ -0,0 +1,408 @@
+# mainwindow/client_table_model.py
+"""
+Lazy model for the main Client table.
+
+Rows are loaded one page at a time with keyset (seek) pagination: each page
+continues after the last loaded (sort key, id) instead of using OFFSET, so
+every page is an index range scan and opening the window costs the same
+whatever the table size. Sorting and filtering both happen in SQL.
+
+A new filter or sort order is queried on the model's worker thread, which
+keeps one reader connection open for its lifetime. Each request gets a
+generation number; a request superseded while queued is skipped, a result
+that arrives after a newer request was made is dropped, and the current one
+replaces the rows in a single model reset.
+
+Writes announced by database.changes are applied row by row: the touched ids
+are refetched and updated, moved, inserted or removed in place.
+
+The Picture column shows a thumbnail (see mainwindow/thumbnails.py), with the
+path as its tooltip.
+"""
+from __future__ import annotations
+import itertools
+import string
+from dataclasses import dataclass
+
+from PyQt6.QtGui import QColor, QGuiApplication, QPixmap
+from PyQt6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QSize, QThread, QTimer, pyqtSignal
+)
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from database.changes import notifier
+from database.connection import ConnectionManager
+from mainwindow.thumbnails import ThumbnailLoader
+
+PAGE_SIZE = 200
+THUMB_PX = 36             # thumbnail box in the Picture column (logical pixels)
+_THUMB_REPAINT_MS = 30    # coalesce repaints while a screenful of thumbnails arrives
+ALLOWED, NOT_ALLOWED = "Allowed to enter", "Not allowed"
+
+
+@dataclass(frozen=True)
+class Column:
+    field: str        # selected expression (what is displayed)
+    title: str
+    key: str          # sort / keyset column (indexed where it matters)
+    collate: str = ""
+    nullable: bool = False
+
+    @property
+    def sort_expr(self) -> str:
+        return f"{self.key} COLLATE {self.collate}" if self.collate else self.key
+
+
+COLUMNS = [
+    Column("id", "ID", "id"),
+    Column("full_name", "Full Name", "full_name", collate="NOCASE"),
+    Column("id_card_text", "ID Card", "id_card"),
+    Column("phone_text", "Phone Number", "phone_text", nullable=True),
+    Column("role", "Role", "role"),
+    Column("picture", "Picture", "picture", nullable=True),
+    Column("created_at", "Created At", "created_at", nullable=True),
+    Column("active_until", "Membership Ends", "active_until", nullable=True),
+    # same rule as ClientInfoDialog, from the trigger-maintained active_until;
+    # sorts by that date (never / expired first), so it uses its index
+    Column(f"CASE WHEN active_until >= date('now','localtime') THEN '{ALLOWED}' ELSE '{NOT_ALLOWED}' END",
+           "Status", "active_until", nullable=True),
+]
+STATUS_COLUMN = len(COLUMNS) - 1
+PICTURE_COLUMN = [c.field for c in COLUMNS].index("picture")
+_STATUS_COLORS = {ALLOWED: QColor("#0a7b34"), NOT_ALLOWED: QColor("#b00020")}
+
+SELECT_CLIENTS = "SELECT " + ", ".join(c.field for c in COLUMNS) + ", " + ", ".join(
+    f"{c.key} AS sort_{i}" for i, c in enumerate(COLUMNS)
+) + " FROM Client"
+_ID = 0
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)  # SQLite NOCASE folds ASCII only
+
+
+def keyset_conditions(col: Column, descending: bool, key, last_id: int) -> list[tuple[str, list]]:
+    """Conditions for the rows after (key, last_id) in (sort_expr, id) order.
+
+    One condition per segment, queried in turn: SQLite sorts NULLs first
+    ascending and last descending, and a single OR-ed condition would turn the
+    index range search into a scan from the start of the index.
+    """
+    if key is None:
+        tail = [(f"{col.key} IS NULL AND id {'<' if descending else '>'} ?", [last_id])]
+        if not descending:
+            tail.append((f"{col.key} IS NOT NULL", []))
+        return tail
+    e, lt = col.sort_expr, "<" if descending else ">"
+    # e >= key keeps it an index range; the OR only breaks ties on id
+    segments = [(f"{e} {lt}= ? AND ({e} {lt} ? OR id {lt} ?)", [key, key, last_id])]
+    if descending and col.nullable:
+        segments.append((f"{col.key} IS NULL", []))
+    return segments
+
+
+@dataclass(frozen=True)
+class View:
+    """What the table shows: filter and sort order."""
+    where: str = ""
+    params: tuple = ()
+    sort_col: int = 0
+    descending: bool = False
+
+
+def page_sql(view: View, keyset: str = "", keyset_params: list | None = None) -> tuple[str, list]:
+    """SQL (without LIMIT) and parameters for a page of view, optionally after a keyset condition."""
+    col = COLUMNS[view.sort_col]
+    conds, params = [], []
+    if view.where:
+        conds.append(f"({view.where})")
+        params += view.params
+    if keyset:
+        conds.append(keyset)
+        params += keyset_params or []
+    direction = "DESC" if view.descending else "ASC"
+    sql = SELECT_CLIENTS
+    if conds:
+        sql += " WHERE " + " AND ".join(conds)
+    return sql + f" ORDER BY {col.sort_expr} {direction}, id {direction}", params
+
+
+def _fetch(db: QSqlDatabase, sql: str, params: list, limit: int) -> tuple[list[tuple] | None, str]:
+    q = QSqlQuery(db)
+    q.setForwardOnly(True)
+    q.prepare(f"{sql} LIMIT {limit}")
+    for i, v in enumerate(params):
+        q.bindValue(i, v)
+    if not q.exec():
+        return None, q.lastError().text()
+    width = len(COLUMNS) * 2
+    rows = []
+    while q.next():
+        # QSqlQuery.value() gives '' for NULL; the keyset needs real NULLs
+        rows.append(tuple(None if q.isNull(i) else q.value(i) for i in range(width)))
+    q.finish()
+    return rows, ""
+
+
+# ---- worker ----
+class _PageWorker(QObject):
+    """Runs first-page queries on the model's worker thread, on that thread's one reader."""
+    done = pyqtSignal(int, object, object, str)   # generation, view, rows, error
+
+    def __init__(self, connections: ConnectionManager):
+        super().__init__()
+        self._connections = connections
+        self.latest = 0   # newest generation asked for (set from the GUI thread)
+
+    def load(self, generation: int, view: View):
+        if generation != self.latest:
+            return   # superseded while queued: never runs
+        sql, params = page_sql(view)
+        rows, err = _fetch(self._connections.reader(), sql, params, PAGE_SIZE)
+        self.done.emit(generation, view, rows, err)
+
+    def close(self):
+        self._connections.close_reader()
+
+
+class ClientTableModel(QAbstractTableModel):
+    load_failed = pyqtSignal(str)
+    _load = pyqtSignal(int, object)   # generation, view -> worker
+    _close_worker = pyqtSignal()
+
+    def __init__(self, connections: ConnectionManager, parent=None):
+        super().__init__(parent)
+        self._connections = connections
+        self._rows: list[tuple] = []
+        self._exhausted = False
+        self._view = View()       # what _rows were loaded for
+        self._wanted = View()     # latest request (may still be loading)
+        self._error = ""
+        self._generations = itertools.count(1)
+        self._generation = 0
+        self._pending = False
+
+        # one long-lived worker thread: its reader connection is opened once and reused
+        self._thread = QThread(self)
+        self._worker = _PageWorker(connections)
+        self._worker.moveToThread(self._thread)
+        self._load.connect(self._worker.load)
+        self._close_worker.connect(self._worker.close)
+        self._worker.done.connect(self._on_first_page)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+        rows, self._error = _fetch(self._connections.reader(), *page_sql(self._view), PAGE_SIZE)
+        self._rows = rows or []
+        self._exhausted = len(self._rows) < PAGE_SIZE
+
+        app = QGuiApplication.instance()
+        self._thumbs = ThumbnailLoader(QSize(THUMB_PX, THUMB_PX), app.devicePixelRatio() if app else 1.0, self)
+        self._thumbs.ready.connect(self._thumb_repaint_later)
+        self._placeholder: QPixmap | None = None
+        self._thumb_timer = QTimer(self)
+        self._thumb_timer.setSingleShot(True)
+        self._thumb_timer.setInterval(_THUMB_REPAINT_MS)
+        self._thumb_timer.timeout.connect(self._repaint_thumbnails)
+
+        changes = notifier()
+        changes.clients_inserted.connect(self.apply_changes)
+        changes.clients_changed.connect(self.apply_changes)
+
+    # -------- Qt model API --------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if index.column() == PICTURE_COLUMN:
+            return self._picture_data(value, role)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return "" if value is None else value
+        if role == Qt.ItemDataRole.ForegroundRole and index.column() == STATUS_COLUMN:
+            return _STATUS_COLORS.get(value)
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section].title
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        page = self._load_page()
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        view = View(self._wanted.where, self._wanted.params,
+                     column, order == Qt.SortOrder.DescendingOrder)
+        if view != self._wanted:   # setSortingEnabled() re-applies the current order
+            self._request(view)
+
+    # -------- app API --------
+    def set_filter(self, where: str, params: list | tuple = ()):
+        """SQL condition on Client (no WHERE keyword); '' shows everything.
+
+        Runs in the background; the rows are swapped in when the query is done.
+        """
+        view = View(where, tuple(params), self._wanted.sort_col, self._wanted.descending)
+        if view != self._wanted:
+            self._request(view)
+
+    def refresh(self):
+        """Load the first page again (in the background)."""
+        self._request(self._wanted)
+
+    def is_loading(self) -> bool:
+        return self._pending
+
+    def shutdown(self):
+        """Close the worker's connection and stop its thread (before the connections close)."""
+        if self._thread.isRunning():
+            self._close_worker.emit()
+            self._thread.quit()
+            self._thread.wait()
+
+    def apply_changes(self, ids: list[int]):
+        """Refetch the given clients and patch the loaded rows in place."""
+        if self._pending:
+            # the pending first page may have read before the write committed
+            self.refresh()
+            return
+        if not ids:
+            return
+        marks = ", ".join("?" * len(ids))
+        fresh, self._error = _fetch(self._connections.reader(),
+                                    *page_sql(self._view, f"id IN ({marks})", list(ids)), len(ids))
+        if fresh is None:
+            return
+        by_id = {row[_ID]: row for row in fresh}   # only ids still matching the filter
+        last = len(COLUMNS) - 1
+        for cid in ids:
+            pos = self._row_of(cid)
+            row = by_id.get(cid)
+            for changed in (row, self._rows[pos] if pos is not None else None):
+                if changed is not None and changed[PICTURE_COLUMN]:
+                    self._thumbs.forget(changed[PICTURE_COLUMN])   # retry a failed or rewritten picture
+            if pos is not None and row is not None and self._order_key(row) == self._order_key(self._rows[pos]):
+                self._rows[pos] = row
+                self.dataChanged.emit(self.index(pos, 0), self.index(pos, last))
+                continue
+            if pos is not None:
+                self.beginRemoveRows(QModelIndex(), pos, pos)
+                del self._rows[pos]
+                self.endRemoveRows()
+            if row is not None:
+                self._insert_sorted(row)
+
+    def client_id(self, row: int) -> int | None:
+        return self._rows[row][_ID] if 0 <= row < len(self._rows) else None
+
+    def sample_rows(self, n: int) -> list[tuple]:
+        return self._rows[:n]
+
+    def last_error(self) -> str:
+        return self._error
+
+    # -------- loading --------
+    def _request(self, view: View):
+        self._wanted = view
+        self._generation = next(self._generations)
+        self._worker.latest = self._generation
+        self._pending = True
+        self._load.emit(self._generation, view)
+
+    def _on_first_page(self, generation: int, view: View, rows: list[tuple] | None, err: str):
+        if generation != self._generation:
+            return   # superseded by a newer filter / sort while it ran
+        self._pending = False
+        self._error = err
+        if rows is None:
+            self.load_failed.emit(err)
+            return
+        self.beginResetModel()
+        self._view = view
+        self._rows = rows
+        self._exhausted = len(rows) < PAGE_SIZE
+        self.endResetModel()
+
+    def _picture_data(self, path: str | None, role):
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return path
+        if role == Qt.ItemDataRole.DisplayRole:
+            return "" if path is None else ("(cannot display)" if self._thumbs.failed(path) else "")
+        if role == Qt.ItemDataRole.DecorationRole and path:
+            return self._thumbs.pixmap(path) or (None if self._thumbs.failed(path) else self._placeholder_pixmap())
+        return None
+
+    def _placeholder_pixmap(self) -> QPixmap:
+        if self._placeholder is None:
+            self._placeholder = QPixmap(THUMB_PX, THUMB_PX)
+            self._placeholder.fill(QColor("#d8d8d8"))
+        return self._placeholder
+
+    def _thumb_repaint_later(self, path: str):
+        if not self._thumb_timer.isActive():
+            self._thumb_timer.start()
+
+    def _repaint_thumbnails(self):
+        # the view repaints only the visible cells of the column
+        if self._rows:
+            self.dataChanged.emit(self.index(0, PICTURE_COLUMN), self.index(len(self._rows) - 1, PICTURE_COLUMN),
+                                  [Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.DisplayRole])
+
+    def _row_of(self, client_id: int) -> int | None:
+        return next((i for i, r in enumerate(self._rows) if r[_ID] == client_id), None)
+
+    def _order_key(self, row: tuple) -> tuple:
+        col = COLUMNS[self._view.sort_col]
+        value = row[len(COLUMNS) + self._view.sort_col]
+        if value is None:
+            return (0, ""), row[_ID]   # NULLs sort first, as in SQLite
+        if col.collate == "NOCASE":
+            value = value.translate(_NOCASE)
+        return (1, value), row[_ID]
+
+    def _insert_sorted(self, row: tuple):
+        key, desc = self._order_key(row), self._view.descending
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = self._order_key(self._rows[mid])
+            if (k < key) if desc else (k > key):
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo == len(self._rows) and not self._exhausted:
+            return   # past the loaded pages: a later fetchMore brings it in
+        self.beginInsertRows(QModelIndex(), lo, lo)
+        self._rows.insert(lo, row)
+        self.endInsertRows()
+
+    def _load_page(self) -> list[tuple]:
+        """The page after the loaded rows (GUI thread; one small index range)."""
+        view = self._view
+        col = COLUMNS[view.sort_col]
+        last = self._rows[-1]
+        segments = keyset_conditions(col, view.descending, last[len(COLUMNS) + view.sort_col], last[_ID])
+        page: list[tuple] = []
+        for cond, params in segments:
+            rows, self._error = _fetch(self._connections.reader(), *page_sql(view, cond, params),
+                                       PAGE_SIZE - len(page))
+            if rows is None:
+                self._exhausted = True
+                return page
+            page += rows
+            if len(page) >= PAGE_SIZE:
+                break
+        self._exhausted = len(page) < PAGE_SIZE
+        return page
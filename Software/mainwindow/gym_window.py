@@ -1,11 +1,11 @@
 from pathlib import Path
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableView,
     QMessageBox, QPushButton, QHeaderView, QDialog, QAbstractItemView,
     QComboBox, QLineEdit, QLabel
 )
-from PyQt6.QtSql import QSqlDatabase, QSqlTableModel
+from PyQt6.QtSql import QSqlQuery
 
 from clientsManagement.client_add import create_add_client_button
 from clientsManagement.client_view import ClientInfoDialog
@@ -13,8 +13,15 @@ from membershipsInfo.memberships_view import MembershipsViewDialog
 from membershipsPlans.membership_plans_view import MembershipPlansViewDialog
 
 from entries_management.entries_view import EntriesViewDialog
+from entries_management.checkin import CheckInDialog
+from database.migrations import migrate
+from database.connection import ConnectionManager
+from database.search_query import QueryError, compile_query
+from mainwindow.client_table_model import PICTURE_COLUMN, THUMB_PX, ClientTableModel
 
-TABLE_NAME = "Client"
+FIT_SAMPLE_ROWS = 50      # rows measured when sizing columns
+MAX_FIT_WIDTH = 400
+SEARCH_DEBOUNCE_MS = 200  # wait for a pause in typing before querying
 
 # Map visible names -> actual DB column names
 COLUMN_MAP = {
@@ -25,31 +32,28 @@ COLUMN_MAP = {
     "Role": "role",
     "Picture": "picture",
     "Created At": "created_at",
+    "Membership Ends": "active_until",
+    "Status": "status",
 }
 
-def _connect_sqlite(db_path: str) -> QSqlDatabase:
+def _connect_sqlite(db_path: str) -> ConnectionManager:
     if not Path(db_path).exists():
         raise FileNotFoundError(f"Database not found: {db_path}")
-    db = QSqlDatabase.addDatabase("QSQLITE")
-    db.setDatabaseName(db_path)
-    if not db.open():
-        raise RuntimeError("Cannot open SQLite database.")
-    db.exec("PRAGMA foreign_keys = ON;")
-    return db
-
-def _escape_like(s: str) -> str:
-    """Escape %, _, and single quotes for a safe LIKE pattern."""
-    return s.replace("'", "''").replace("%", r"\%").replace("_", r"\_")
+    migrate(db_path)   # upgrade older gym.db files in place before Qt opens them
+    return ConnectionManager(db_path)
 
 class GymMainWindow(QMainWindow):
     def __init__(self, db_path: str):
         super().__init__()
         self.setWindowTitle("Gym — Clients")
         try:
-            self.db = _connect_sqlite(db_path)
+            self.connections = _connect_sqlite(db_path)
         except Exception as e:
             QMessageBox.critical(self, "Database Error", str(e))
             raise
+        # Dialogs write through the writer; the big table reads use their own connection.
+        self.db = self.connections.writer()
+        self._has_fts = "client_fts" in self.db.tables()
 
         root = QWidget(self)
         main = QVBoxLayout(root)
@@ -57,7 +61,7 @@ class GymMainWindow(QMainWindow):
 
         # ---- Top actions bar ----
         top = QHBoxLayout()
-        add_btn = create_add_client_button(parent=self, db=self.db, on_saved=self._refresh)
+        add_btn = create_add_client_button(parent=self, db=self.db)
 
         memberships_btn = QPushButton("Memberships")
         memberships_btn.clicked.connect(self._open_memberships_view)
@@ -68,20 +72,26 @@ class GymMainWindow(QMainWindow):
         entries_btn = QPushButton("Entries")
         entries_btn.clicked.connect(self._open_entries_view)
 
+        checkin_btn = QPushButton("Check-in")
+        checkin_btn.clicked.connect(self._open_checkin)
+
         top.addWidget(add_btn)
         top.addWidget(memberships_btn)
         top.addWidget(plans_btn)
         top.addWidget(entries_btn)
+        top.addWidget(checkin_btn)
         top.addStretch(1)
         main.addLayout(top)
 
         # ---- Search bar ----
         search_bar = QHBoxLayout()
         self.field_combo = QComboBox()
-        self.field_combo.addItems(["ID", "Full Name", "ID Card", "Phone Number", "Role", "Created At"])
+        self.field_combo.addItems(["ID", "Full Name", "ID Card", "Phone Number", "Role", "Created At", "Membership Ends", "Status"])
         self.search_edit = QLineEdit()
-        self.search_edit.setPlaceholderText("Type to search…")
+        self.search_edit.setPlaceholderText("Type to search…  or e.g. role:coach name:ali created:>=2025-01 status:expired")
         self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setToolTip("Names, ID cards and phones: 1-2 characters match the start, "
+                                    "3 or more match anywhere.")
 
         search_bar.addWidget(QLabel("Search in:"))
         search_bar.addWidget(self.field_combo, 0)
@@ -92,18 +102,18 @@ class GymMainWindow(QMainWindow):
         self.view = QTableView(self)
         main.addWidget(self.view, 1)
 
-        self.model = QSqlTableModel(self, self.db)
-        self.model.setTable(TABLE_NAME)
-        self.model.setEditStrategy(QSqlTableModel.EditStrategy.OnManualSubmit)
-
-        headers = ["ID", "Full Name", "ID Card", "Phone Number", "Role", "Picture", "Created At"]
-        for i, h in enumerate(headers):
-            self.model.setHeaderData(i, Qt.Orientation.Horizontal, h)
-
+        # Pages in more rows as the view scrolls (canFetchMore/fetchMore);
+        # sorting and filtering run in SQL on a background reader connection.
+        self.model = ClientTableModel(self.connections, self)
+        self.model.load_failed.connect(
+            lambda err: self.statusBar().showMessage(f"Search failed: {err}", 5000))
         self.view.setModel(self.model)
-        self.view.setSortingEnabled(True)
+        self.view.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.view.setSortingEnabled(True)   # header clicks call model.sort()
         self.view.setAlternatingRowColors(True)
         self.view.verticalHeader().setVisible(False)
+        self.view.verticalHeader().setDefaultSectionSize(THUMB_PX + 4)
+        self.view.setIconSize(QSize(THUMB_PX, THUMB_PX))
         self.view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
 
@@ -115,78 +125,67 @@ class GymMainWindow(QMainWindow):
         header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         header.setStretchLastSection(False)
 
-        # Auto-fit a few columns initially
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Full Name
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # ID Card
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # Phone Number
-
-        self.view.setColumnWidth(1, max(self.view.columnWidth(1), 220))
-        self.view.setColumnWidth(3, max(self.view.columnWidth(3), 150))
-
         self.view.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
 
         header.setSectionsClickable(True)
         header.sectionDoubleClicked.connect(self.view.resizeColumnToContents)
-
-        # ---- Click-to-sort (uses SQL ORDER BY) ----
         header.setSortIndicatorShown(True)
-        header.sortIndicatorChanged.connect(self._on_sort_changed)
 
-        # ---- Live search wiring ----
-        self.search_edit.textChanged.connect(self._apply_filter)
+        # ---- Live search wiring (debounced) ----
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._apply_filter)
+        self.search_edit.textChanged.connect(self._search_timer.start)   # restarts on each key
         self.field_combo.currentIndexChanged.connect(self._apply_filter)
 
-        # Initial load
-        self.model.select()
-        self.view.resizeColumnsToContents()
+        self._fit_columns()
 
     # ---------- Behaviors ----------
     def _apply_filter(self):
         field_label = self.field_combo.currentText()
         column = COLUMN_MAP.get(field_label)
-        if not column:
-            self.model.setFilter("")
-            self.model.select()
-            return
-
         txt = self.search_edit.text().strip()
-        if not txt:
-            self.model.setFilter("")
-            self.model.select()
+        self._search_timer.stop()
+        try:
+            cond, params = compile_query(txt, column, self._has_fts, self._max_client_id)
+        except QueryError as e:
+            self.statusBar().showMessage(str(e), 5000)
             return
-
-        esc = _escape_like(txt)
-
-        if column == "id":
-            if esc.isdigit():
-                cond = f"CAST({column} AS TEXT) LIKE '{esc}%' ESCAPE '\\'"
-            else:
-                cond = "1=0"
-        elif column == "created_at":
-            cond = f"{column} LIKE '%{esc}%' ESCAPE '\\'"
-        else:
-            cond = f"{column} LIKE '%{esc}%' ESCAPE '\\'"
-
-        self.model.setFilter(cond)
-        self.model.select()
-
-    def _on_sort_changed(self, section: int, order: Qt.SortOrder):
-        self.model.setSort(section, order)
-        self.model.select()
-
-    def _refresh(self):
-        self.model.select()
-        self.view.resizeColumnsToContents()
+        self.statusBar().clearMessage()
+        self.model.set_filter(cond, params)   # no-op when unchanged (e.g. trailing space typed)
+
+    def _max_client_id(self) -> int:
+        q = QSqlQuery(self.connections.reader())
+        if q.exec("SELECT COALESCE(MAX(id), 0) FROM Client") and q.next():
+            return int(q.value(0))
+        return 0
+
+    def _fit_columns(self):
+        """Size columns from the first rows only (resizeColumnsToContents would
+        measure every loaded row)."""
+        fm = self.view.fontMetrics()
+        header = self.view.horizontalHeader()
+        pad = 24   # cell margins + sort indicator
+        rows = self.model.sample_rows(FIT_SAMPLE_ROWS)
+        for col in range(self.model.columnCount()):
+            title = str(self.model.headerData(col, Qt.Orientation.Horizontal))
+            width = fm.horizontalAdvance(title) + pad
+            if col == PICTURE_COLUMN:   # a thumbnail, not the path
+                header.resizeSection(col, max(width, THUMB_PX + pad))
+                continue
+            for row in rows:
+                value = row[col]
+                if value is not None:
+                    width = max(width, fm.horizontalAdvance(str(value)) + pad)
+            header.resizeSection(col, min(width, MAX_FIT_WIDTH))
 
     def _open_client_details(self, index):
         if not index.isValid():
             return
-        row = index.row()
-        record = self.model.record(row)
-        client_id = record.value(0)
+        client_id = self.model.client_id(index.row())
         dlg = ClientInfoDialog(self.db, client_id, parent=self)
-        dlg.refreshed.connect(self._refresh)
         dlg.exec()
 
     def _open_memberships_view(self):
@@ -199,5 +198,14 @@ class GymMainWindow(QMainWindow):
 
     
     def _open_entries_view(self):
-        dlg = EntriesViewDialog(self.db, parent=self)
+        dlg = EntriesViewDialog(self.db, parent=self, read_db=self.connections.reader())
+        dlg.exec()
+
+    def _open_checkin(self):
+        dlg = CheckInDialog(self.db, parent=self)
         dlg.exec()
+
+    def closeEvent(self, event):
+        self.model.shutdown()
+        self.connections.close()
+        super().closeEvent(event)
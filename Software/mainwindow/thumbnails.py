@@ -0,0 +1,118 @@
+# mainwindow/thumbnails.py
+"""
+Background thumbnails for the client table.
+
+The view only asks for the cells it paints, so only pictures in the viewport
+are ever requested. A request decodes the stored 64px size (or, for pictures
+saved before sizes existed, the original at thumbnail size) on a worker
+pool; the GUI thread only turns the QImage into a pixmap and puts it in the
+shared pixmap cache. Until then the cell shows a placeholder.
+
+Requests are served newest first and the backlog is capped, so after a fast
+scroll the rows now on screen are decoded before the ones scrolled past.
+
+A picture that cannot be read (it may be caught halfway through a copy) is
+retried after FAILED_RETRY_S, or as soon as forget() is called for it.
+"""
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from clientsManagement.pictures import THUMB_SIZE, derivative_path, read_image
+from clientsManagement.pixmap_cache import PixmapCache, pixmap_cache
+
+MAX_QUEUED = 128   # a couple of screens; older requests are dropped (asked again if still shown)
+FAILED_RETRY_S = 30
+
+
+class _Signals(QObject):
+    done = pyqtSignal(str, object, QImage)   # path, cache key (or None), image
+
+
+class _ThumbJob(QRunnable):
+    def __init__(self, path: str, size: QSize, device_pixel_ratio: float):
+        super().__init__()
+        self.signals = _Signals()
+        self._path, self._size, self._dpr = path, size, device_pixel_ratio
+
+    def run(self):
+        key = PixmapCache.key(self._path, self._size, self._dpr)
+        img = QImage()
+        if key is not None:
+            small = derivative_path(Path(self._path), THUMB_SIZE)
+            src = small if small.exists() else self._path
+            img = read_image(src, QSize(key[1], key[2]))
+        self.signals.done.emit(self._path, key, img)
+
+
+class ThumbnailLoader(QObject):
+    ready = pyqtSignal(str)   # path whose thumbnail is now cached (or failed)
+
+    def __init__(self, size: QSize, device_pixel_ratio: float = 1.0, parent=None):
+        super().__init__(parent)
+        self._size, self._dpr = QSize(size), device_pixel_ratio
+        self._keys: dict[str, tuple] = {}             # path -> cache key of its thumbnail
+        self._failed: dict[str, float] = {}           # path -> monotonic time it failed
+        self._queued: OrderedDict[str, None] = OrderedDict()
+        self._running: dict[str, _ThumbJob] = {}
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(4, QThreadPool.globalInstance().maxThreadCount() - 1)))
+
+    def pixmap(self, path: str) -> QPixmap | None:
+        """The cached thumbnail, or None (a load is then requested)."""
+        key = self._keys.get(path)
+        if key is not None:
+            pm = pixmap_cache().get(key)
+            if pm is not None:
+                return pm
+            del self._keys[path]   # evicted: load again
+        if not self.failed(path):
+            self._request(path)
+        return None
+
+    def failed(self, path: str) -> bool:
+        since = self._failed.get(path)
+        if since is not None and time.monotonic() - since >= FAILED_RETRY_S:
+            del self._failed[path]
+            return False
+        return since is not None
+
+    def forget(self, path: str):
+        """Drop what is known about path (its file was rewritten): the next paint loads it again."""
+        self._failed.pop(path, None)
+        self._keys.pop(path, None)
+
+    # ---- internals ----
+    def _request(self, path: str):
+        if path in self._running:
+            return
+        self._queued[path] = None
+        self._queued.move_to_end(path)
+        while len(self._queued) > MAX_QUEUED:
+            self._queued.popitem(last=False)
+        self._pump()
+
+    def _pump(self):
+        while self._queued and len(self._running) < self._pool.maxThreadCount():
+            path, _ = self._queued.popitem(last=True)   # newest first: what is on screen now
+            job = _ThumbJob(path, self._size, self._dpr)
+            job.setAutoDelete(False)
+            job.signals.done.connect(self._on_done)
+            self._running[path] = job
+            self._pool.start(job)
+
+    def _on_done(self, path: str, key, img: QImage):
+        self._running.pop(path, None)
+        if key is None or img.isNull():
+            self._failed[path] = time.monotonic()
+        else:
+            pm = QPixmap.fromImage(img)
+            pm.setDevicePixelRatio(self._dpr)
+            pixmap_cache().put(key, pm)
+            self._keys[path] = key
+        self.ready.emit(path)
+        self._pump()
@@ -1,13 +1,16 @@
 # income_summary.py
 from __future__ import annotations
 from dataclasses import dataclass
+from datetime import date
 
 from PyQt6.QtCore import QDate
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit,
     QDialogButtonBox, QMessageBox, QWidget
 )
-from PyQt6.QtSql import QSqlQuery
+
+from database.days import day_key
+from database.repository import repository_for
 
 
 @dataclass
@@ -65,22 +68,15 @@ def show_income_for_period(db, parent: QWidget | None = None):
         QMessageBox.warning(parent, "Invalid period", "'To' date must be after 'From' date.")
         return
 
-    q = QSqlQuery(db)
-    q.prepare("""
-        SELECT COALESCE(SUM(price_paid), 0) AS total_income,
-               COUNT(*) AS num_memberships
-        FROM memberships
-        WHERE start_date BETWEEN ? AND ?
-    """)
-    q.addBindValue(rng.start)
-    q.addBindValue(rng.end)
-
-    if not q.exec() or not q.next():
+    # integer day keys: a range scan on idx_memberships_start_day (covers price_paid)
+    result = repository_for(db).income_for_period(
+        day_key(date.fromisoformat(rng.start)), day_key(date.fromisoformat(rng.end))
+    )
+    if result is None:
         QMessageBox.critical(parent, "Error", "Failed to query income.")
         return
 
-    total_income = q.value(0) or 0
-    count = q.value(1) or 0
+    total_income, count = result
 
     QMessageBox.information(
         parent,
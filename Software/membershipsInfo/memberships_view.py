@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtSql import QSqlTableModel
 from PyQt6.QtWidgets import QHeaderView
+from database.repository import repository_for
 from .income_summary import show_income_for_period
 
 
@@ -50,6 +51,9 @@ class MembershipsViewDialog(QDialog):
             self.model.setHeaderData(i, Qt.Orientation.Horizontal, h)
 
         self.table.setModel(self.model)
+        # integer day keys are for indexing only (generated from the dates)
+        for name in ("start_day", "end_day"):
+            self.table.setColumnHidden(self.model.fieldIndex(name), True)
         self.table.setSortingEnabled(True)
         self.table.setAlternatingRowColors(True)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
@@ -72,11 +76,17 @@ class MembershipsViewDialog(QDialog):
         if confirm != QMessageBox.StandardButton.Yes:
             return
 
-        for index in selection:
-            self.model.removeRow(index.row())
+        id_col = self.model.fieldIndex("id")
+        ids = [int(self.model.data(self.model.index(index.row(), id_col))) for index in selection]
 
-        if not self.model.submitAll():
-            QMessageBox.critical(self, "Error", "Failed to delete membership(s).")
-            self.model.revertAll()
-        else:
-            self.model.select()
+        # through the repository, so the main table and the check-in index hear about it
+        repo = repository_for(self._db)
+        try:
+            with repo.transaction():
+                ok, err = repo.delete_memberships(ids)
+                if not ok:
+                    raise RuntimeError(err)
+        except RuntimeError as e:
+            QMessageBox.critical(self, "Error", f"Failed to delete membership(s).\n{e}")
+            return
+        self.model.select()
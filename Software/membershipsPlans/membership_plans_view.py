@@ -3,7 +3,9 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTableView, QPushButton,
     QHeaderView, QMessageBox, QFormLayout, QLineEdit, QComboBox, QDialogButtonBox
 )
-from PyQt6.QtSql import QSqlTableModel, QSqlQuery
+from PyQt6.QtSql import QSqlTableModel
+
+from database.repository import repository_for
 
 
 class _PlanFormDialog(QDialog):
@@ -72,6 +74,7 @@ class MembershipPlansViewDialog(QDialog):
         self.setWindowTitle("Membership Plans")
         self.resize(760, 420)
         self._db = db
+        self._repo = repository_for(db)
 
         # ✅ Enable minimize, maximize, and close buttons
         self.setWindowFlags(
@@ -148,16 +151,9 @@ class MembershipPlansViewDialog(QDialog):
             data = dlg.result_data()
             if not data:
                 return
-            q = QSqlQuery(self._db)
-            q.prepare("""
-                INSERT INTO membership_plans (name, months, price_decimal)
-                VALUES (?, ?, ?)
-            """)
-            q.addBindValue(data["name"])
-            q.addBindValue(data["months"])
-            q.addBindValue(data["price_decimal"])
-            if not q.exec():
-                QMessageBox.critical(self, "DB Error", q.lastError().text())
+            ok, err = self._repo.insert_plan(data["name"], data["months"], data["price_decimal"])
+            if not ok:
+                QMessageBox.critical(self, "DB Error", err)
                 return
             self._refresh()
 
@@ -176,18 +172,9 @@ class MembershipPlansViewDialog(QDialog):
             data = dlg.result_data()
             if not data:
                 return
-            q = QSqlQuery(self._db)
-            q.prepare("""
-                UPDATE membership_plans
-                SET name = ?, months = ?, price_decimal = ?
-                WHERE id = ?
-            """)
-            q.addBindValue(data["name"])
-            q.addBindValue(data["months"])
-            q.addBindValue(data["price_decimal"])
-            q.addBindValue(plan_id)
-            if not q.exec():
-                QMessageBox.critical(self, "DB Error", q.lastError().text())
+            ok, err = self._repo.update_plan(plan_id, data["name"], data["months"], data["price_decimal"])
+            if not ok:
+                QMessageBox.critical(self, "DB Error", err)
                 return
             self._refresh()
             # Keep the edited row selected if possible
@@ -206,10 +193,8 @@ class MembershipPlansViewDialog(QDialog):
         )
         if confirm != QMessageBox.StandardButton.Yes:
             return
-        q = QSqlQuery(self._db)
-        q.prepare("DELETE FROM membership_plans WHERE id = ?")
-        q.addBindValue(plan_id)
-        if not q.exec():
-            QMessageBox.critical(self, "DB Error", q.lastError().text())
+        ok, err = self._repo.delete_plan(plan_id)
+        if not ok:
+            QMessageBox.critical(self, "DB Error", err)
             return
         self._refresh()
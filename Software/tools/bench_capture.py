@@ -0,0 +1,180 @@
+# tools/bench_capture.py
+"""
+Time the phone capture dialog against the fake adb (tools/fake_adb.py),
+offscreen, with no phone attached.
+
+    python -m tools.bench_capture
+    python -m tools.bench_capture --captures 20 --latency 0.05 --bps 20e6 --json bench/capture.json
+
+For each capture a photo is dropped into the fake phone's folder while the
+dialog is waiting, and the time until the preview is shown is measured. The
+fake logs every adb process started, which gives the process spawns per
+capture and per minute while the dialog sits waiting. The longest gap
+between ticks of a 5 ms GUI timer shows whether the event loop stalled.
+
+POSIX only: the launcher ADB_PATH points at is a shell script.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QBuffer, QElapsedTimer, QEventLoop, QIODevice, QTimer, Qt
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+SOFTWARE_DIR = Path(__file__).resolve().parent.parent
+STEP_TIMEOUT_S = 30
+
+
+def _launcher(folder: Path) -> Path:
+    adb = folder / "adb"
+    adb.write_text(f'#!/bin/sh\nPYTHONPATH="{SOFTWARE_DIR}" exec "{sys.executable}" -m tools.fake_adb "$@"\n',
+                   encoding="utf-8")
+    adb.chmod(0o755)
+    return adb
+
+
+def _photo(width: int, height: int) -> bytes:
+    """A JPEG about the size of a phone photo (smooth noise, so it compresses like one)."""
+    w, h = max(1, width // 8), max(1, height // 8)
+    noise = QImage(os.urandom(w * h * 4), w, h, w * 4, QImage.Format.Format_RGB32)
+    img = noise.scaled(width, height, transformMode=Qt.TransformationMode.SmoothTransformation)
+    buf = QBuffer()
+    buf.open(QIODevice.OpenModeFlag.WriteOnly)
+    img.save(buf, "JPG", 92)
+    return bytes(buf.data())
+
+
+def _wait_for(done, timeout_s: float = STEP_TIMEOUT_S) -> bool:
+    """Run the event loop until done() is true; False on timeout."""
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: done() and loop.quit())
+    poll.start(1)
+    QTimer.singleShot(int(timeout_s * 1000), loop.quit)
+    if not done():
+        loop.exec()
+    poll.stop()
+    return done()
+
+
+def _spawns(log: Path, since: float, until: float) -> int:
+    try:
+        lines = log.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return 0
+    return sum(1 for line in lines if since <= float(line.split(" ", 1)[0]) < until)
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--captures", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds each fake adb call waits")
+    ap.add_argument("--bps", type=float, default=0, help="fake USB speed for pulls, bytes/s (0 = unlimited)")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="chance that a fake adb call fails")
+    ap.add_argument("--photo-px", default="4000x3000", help="size of the photos taken")
+    ap.add_argument("--gap", type=float, default=0.5, help="seconds waiting between captures")
+    ap.add_argument("--idle", type=float, default=10.0, help="seconds to count spawns while waiting")
+    ap.add_argument("--json", type=Path, help="write the results as JSON")
+    args = ap.parse_args()
+    if os.name == "nt":
+        sys.exit("bench_capture needs a POSIX shell for the fake adb launcher")
+
+    work = Path(tempfile.mkdtemp(prefix="bench_capture_"))
+    log = work / "adb.log"
+    os.environ.update({
+        "ADB_PATH": str(_launcher(work)),
+        "FAKE_ADB_PHONE": str(work / "phone"),
+        "FAKE_ADB_LATENCY": str(args.latency),
+        "FAKE_ADB_BPS": str(args.bps),
+        "FAKE_ADB_FAIL_RATE": str(args.fail_rate),
+        "FAKE_ADB_LOG": str(log),
+    })
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from clientsManagement.phone_capture import ANDROID_DIR, PhoneCaptureDialog, State
+
+    folder = work / "phone" / ANDROID_DIR.lstrip("/")
+    folder.mkdir(parents=True)
+    width, height = (int(v) for v in args.photo_px.lower().split("x"))
+    photo = _photo(width, height)
+
+    # ---- GUI stall probe ----
+    tick, stall = QElapsedTimer(), [0]
+    probe = QTimer()
+    probe.timeout.connect(lambda: (stall.__setitem__(0, max(stall[0], tick.restart()))))
+
+    dlg = PhoneCaptureDialog()
+    dlg.show()
+    shown = []
+    dlg.state_changed.connect(
+        lambda s: s == State.SHOWING and QTimer.singleShot(0, lambda: shown.append(time.perf_counter())))
+    t_open = time.perf_counter()
+    if not _wait_for(lambda: dlg.state == State.WAITING):
+        sys.exit(f"Dialog never reached WAITING (stuck at {dlg.state.name})")
+    ready_s = time.perf_counter() - t_open
+    tick.start()
+    probe.start(5)
+
+    # ---- captures ----
+    latencies = []
+    t_first = time.time()
+    for i in range(args.captures):
+        _wait_for(lambda: False, args.gap)
+        tmp = folder / f".IMG_{i:04d}.tmp"
+        tmp.write_bytes(photo)
+        t0 = time.perf_counter()
+        tmp.rename(folder / f"IMG_{i:04d}.jpg")   # appears complete, as a camera's rename does
+        if not _wait_for(lambda: len(shown) > i):
+            sys.exit(f"Capture {i + 1}: no preview after {STEP_TIMEOUT_S}s (state {dlg.state.name})")
+        latencies.append((shown[i] - t0) * 1000)
+        if dlg.selected_data != photo:
+            sys.exit(f"Capture {i + 1}: received photo differs from the one taken")
+        dlg.btn_again.click()
+        if not _wait_for(lambda: dlg.state == State.WAITING):
+            sys.exit(f"Capture {i + 1}: dialog did not return to WAITING (state {dlg.state.name})")
+    t_last = time.time()
+
+    # ---- idle ----
+    t_idle = time.time()
+    _wait_for(lambda: False, args.idle)
+    idle_spawns = _spawns(log, t_idle, time.time())
+    probe.stop()
+    dlg.done(0)
+    _wait_for(lambda: False, 0.2)
+
+    result = {
+        "photo_bytes": len(photo),
+        "latency": args.latency, "bps": args.bps, "fail_rate": args.fail_rate,
+        "open_to_waiting_ms": round(ready_s * 1000, 1),
+        "captures": len(latencies),
+        "preview_median_ms": round(statistics.median(latencies), 1),
+        "preview_p95_ms": round(_pct(latencies, 0.95), 1),
+        "preview_max_ms": round(max(latencies), 1),
+        "spawns_per_capture": round(_spawns(log, t_first, t_last) / len(latencies), 2),
+        "idle_spawns_per_minute": round(idle_spawns * 60 / args.idle, 1),
+        "max_gui_stall_ms": stall[0],
+    }
+    for k, v in result.items():
+        print(f"{k:<24}{v:>12}")
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    del app
+
+
+if __name__ == "__main__":
+    main()
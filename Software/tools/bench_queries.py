@@ -0,0 +1,264 @@
+# tools/bench_queries.py
+"""
+Time every SQL statement the dialogs issue against a (generated) gym.db.
+
+    python -m tools.bench_queries --db bench/gym.db --out bench/baseline.json
+    python -m tools.bench_queries --db bench/gym.db --baseline bench/baseline.json
+
+With --baseline, each statement is compared with the saved run. The exit code
+is 1 when one got slower than --tolerance times its baseline (and by more than
+--min-ms), or when its query plan changed. Writes run inside a transaction
+that is rolled back, so the database is left untouched.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+from database import repository as repo
+from database.days import day_key
+from database.search_query import compile_query
+from entries_management.entry_add import ACTIVE_CLIENTS_QUERY, ACTIVE_CLIENTS_BY_NUMBER_QUERY
+from entries_management.entries_view import ENTRIES_QUERY
+from mainwindow.client_table_model import COLUMNS, PAGE_SIZE, STATUS_COLUMN, View, keyset_conditions, page_sql
+
+PAGE = 256   # rows a QSqlQueryModel / QSqlTableModel fetches up front
+
+
+@dataclass
+class Sample:
+    """Realistic parameter values picked from the database being measured."""
+    client_id: int
+    max_id: int
+    card: str
+    phone: str
+    name: str
+    plan_id: int | None
+    membership_id: int
+    picture: str
+    unused_plan_id: int   # a free id, for a plan with no memberships
+
+
+@dataclass(frozen=True)
+class Bench:
+    sql: str
+    params: Callable[[Sample], tuple | dict]
+    fetch: int | None = None      # rows to fetch; None = all
+    write: bool = False           # run inside a rolled-back transaction
+    setup: str = ""               # (write) run first in that transaction, same params, not timed
+
+
+def _today() -> dict:
+    return {"today": date.today().isoformat(), "today_day": day_key(date.today())}
+
+
+def _main_table(cond: str, sort_col: int = 0) -> str:
+    # the first page ClientTableModel loads for a filter and sort column
+    sql, _ = page_sql(View(cond, sort_col=sort_col))
+    return f"{sql} LIMIT {PAGE_SIZE}"
+
+
+def _next_page(sort_col: int) -> str:
+    # a later page: keyset condition after the last loaded (key, id)
+    cond, _ = keyset_conditions(COLUMNS[sort_col], False, "", 0)[0]
+    sql, _ = page_sql(View(sort_col=sort_col), cond)
+    return f"{sql} LIMIT {PAGE_SIZE}"
+
+
+def _benches(s: Sample) -> dict[str, Bench]:
+    month_ago = date.today() - timedelta(days=30)
+
+    def search(text: str, column: str | None = None) -> Bench:
+        # the search box: compiled condition + bound values, first page
+        cond, params = compile_query(text, column, True, lambda: s.max_id)
+        return Bench(_main_table(cond), lambda s: tuple(params))
+
+    return {
+        # ClientInfoDialog / edit / role / membership dialogs
+        "load_client": Bench(repo.LOAD_CLIENT_SQL, lambda s: (s.client_id,)),
+        "client_active_until": Bench(repo.CLIENT_ACTIVE_UNTIL_SQL, lambda s: (s.client_id,)),
+        "update_client": Bench(repo.UPDATE_CLIENT_SQL, lambda s: (
+            s.name, int(s.card), s.card, int(s.phone), s.phone, s.client_id), write=True),
+        "set_client_role": Bench(repo.SET_CLIENT_ROLE_SQL, lambda s: ("coach", s.client_id), write=True),
+        "insert_client": Bench(repo.INSERT_CLIENT_SQL, lambda s: (
+            "Bench Client", 99_999_999_999, "99999999999", None, None, "x.jpg", "2025-01-01 00:00:00"),
+            write=True),
+        "set_client_picture": Bench(repo.SET_CLIENT_PICTURE_SQL, lambda s: ("bench.jpg", s.client_id), write=True),
+        "picture_sizes": Bench(repo.PICTURE_SIZES_SQL, lambda s: (s.picture,)),
+        "clear_picture_sizes": Bench(repo.CLEAR_PICTURE_SIZES_SQL, lambda s: (s.picture,), write=True),
+        "insert_picture_size": Bench(repo.INSERT_PICTURE_SIZE_SQL, lambda s: (   # size 1: never recorded
+            s.picture, 1, s.picture + "@1.jpg"), write=True),
+        # face store (clientsManagement/face_store.py)
+        "blob_for_source": Bench(repo.BLOB_FOR_SOURCE_SQL, lambda s: ("0" * 64,)),
+        "add_face_blob": Bench(repo.INSERT_FACE_BLOB_SQL, lambda s: (
+            "f" * 64, s.picture, 30_000, "0" * 64, s.picture, s.picture, "2025-01-01 00:00:00"), write=True),
+        "face_blob_refcount": Bench(repo.FACE_BLOB_REFCOUNT_SQL, lambda s: ("f" * 64,)),
+        "picture_history": Bench(repo.PICTURE_HISTORY_SQL, lambda s: (s.client_id,)),
+        "list_plans": Bench(repo.LIST_PLANS_SQL, lambda s: ()),
+        "insert_plan": Bench(repo.INSERT_PLAN_SQL, lambda s: ("Bench plan", 1, 1000), write=True),
+        "update_plan": Bench(repo.UPDATE_PLAN_SQL, lambda s: ("Bench plan", 1, 1000, s.plan_id), write=True),
+        "delete_plan": Bench(repo.DELETE_PLAN_SQL, lambda s: (s.plan_id,), write=True),
+        "delete_unused_plan": Bench(repo.DELETE_PLAN_SQL, lambda s: (s.unused_plan_id,), write=True,
+                                    setup="INSERT INTO membership_plans (id, name, months, price_decimal) "
+                                          "VALUES (?, 'Bench plan', 1, 1000)"),
+        "add_membership": Bench(repo.INSERT_MEMBERSHIP_SQL, lambda s: (
+            s.client_id, s.plan_id, date.today().isoformat(),
+            (date.today() + timedelta(days=30)).isoformat(), 3000), write=True),
+        "membership_client": Bench(repo.MEMBERSHIP_CLIENT_SQL, lambda s: (s.membership_id,)),
+        "delete_membership": Bench(repo.DELETE_MEMBERSHIP_SQL, lambda s: (s.membership_id,), write=True),
+        "income_last_30_days": Bench(repo.INCOME_FOR_PERIOD_SQL, lambda s: (
+            day_key(month_ago), day_key(date.today()))),
+        # entries
+        "entries_view_first_page": Bench(ENTRIES_QUERY, lambda s: (), fetch=PAGE),
+        "active_clients": Bench(ACTIVE_CLIENTS_QUERY, lambda s: _today()),
+        "active_clients_by_card": Bench(ACTIVE_CLIENTS_BY_NUMBER_QUERY, lambda s: {
+            **_today(), "lo": s.card[:4], "hi": s.card[:3] + chr(ord(s.card[3]) + 1)}),
+        "add_entry": Bench(repo.INSERT_ENTRY_SQL, lambda s: (s.client_id,), write=True),
+        # CheckInDialog / ActiveMemberIndex
+        "checkin_members": Bench(repo.CHECKIN_MEMBERS_SQL, lambda s: (day_key(date.today()),)),
+        "checkin_member": Bench(repo.CHECKIN_MEMBER_SQL, lambda s: (s.client_id, day_key(date.today()))),
+        "client_by_card": Bench(repo.CLIENT_BY_CARD_SQL, lambda s: (int(s.card),)),
+        # GymMainWindow table and search box
+        "main_table_first_page": Bench(_main_table(""), lambda s: ()),
+        "main_table_sorted_by_name": Bench(_main_table("", 1), lambda s: ()),
+        "main_table_sorted_by_status": Bench(_main_table("", STATUS_COLUMN), lambda s: ()),
+        "main_table_next_page_by_name": Bench(_next_page(1), lambda s: (s.name, s.name, s.client_id)),
+        "main_table_next_page_by_date": Bench(_next_page(6), lambda s: (
+            "2024-01-01", "2024-01-01", s.client_id)),
+        "search_id_prefix": search(str(s.client_id)[:2], "id"),
+        "search_name_prefix": search(s.name[:2], "full_name"),
+        "search_name_substring": search(s.name[1:5], "full_name"),
+        "search_card_prefix": search(s.card[:2], "id_card"),
+        "search_phone_substring": search(s.phone[3:7], "phone_number"),
+        "search_role_like": search("coach", "role"),
+        "query_role_name": search(f"role:coach name:{s.name[:3]}"),
+        "query_created_month": search(f"created:{date.today().year - 1}-03"),
+        "query_expired_members": search("status:expired"),
+        "query_expired_since": search(f"until:>={date.today().year}-01 status:expired"),
+        # MembershipsViewDialog
+        "memberships_first_page": Bench("SELECT * FROM memberships", lambda s: (), fetch=PAGE),
+    }
+
+
+def _sample(conn: sqlite3.Connection, rng: random.Random) -> Sample:
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Client").fetchone()[0]
+    if not max_id:
+        sys.exit("The database has no clients; fill it with tools.generate_data first.")
+    row = None
+    while row is None:
+        row = conn.execute(
+            "SELECT id, id_card_text, phone_text, full_name, picture FROM Client WHERE id >= ? LIMIT 1",
+            (rng.randint(1, max_id),),
+        ).fetchone()
+    plan = conn.execute("SELECT id FROM membership_plans LIMIT 1").fetchone()
+    membership = conn.execute("SELECT COALESCE(MAX(id), 0) FROM memberships").fetchone()
+    free_plan = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM membership_plans").fetchone()
+    return Sample(row[0], max_id, row[1], row[2] or "0000000", row[3], plan[0] if plan else None,
+                  membership[0], row[4] or "", free_plan[0])
+
+
+def _time(conn: sqlite3.Connection, bench: Bench, sample: Sample, repeat: int) -> dict:
+    params = bench.params(sample)
+    plan = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + bench.sql, params)]
+    times, rows = [], 0
+    for i in range(repeat + 1):   # first run warms the page cache and is discarded
+        if bench.write:
+            conn.execute("BEGIN")
+            if bench.setup:
+                conn.execute(bench.setup, params)
+        started = time.perf_counter()
+        cur = conn.execute(bench.sql, params)
+        rows = len(cur.fetchmany(bench.fetch) if bench.fetch else cur.fetchall())
+        elapsed = (time.perf_counter() - started) * 1000
+        cur.close()
+        if bench.write:
+            conn.execute("ROLLBACK")
+        if i:
+            times.append(elapsed)
+    times.sort()
+    return {
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "min_ms": round(times[0], 3),
+        "rows": rows,
+        "plan": plan,
+    }
+
+
+def _compare(current: dict, baseline: dict, tolerance: float, min_ms: float) -> list[str]:
+    problems = []
+    for name, now in current["queries"].items():
+        then = baseline["queries"].get(name)
+        if then is None:
+            continue
+        slower = now["median_ms"] - then["median_ms"]
+        if now["median_ms"] > then["median_ms"] * tolerance and slower > min_ms:
+            problems.append(f"{name}: {then['median_ms']:.2f} ms -> {now['median_ms']:.2f} ms")
+        if now["plan"] != then["plan"]:
+            problems.append(f"{name}: query plan changed\n    was: {then['plan']}\n    now: {now['plan']}")
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", type=Path, required=True)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=1, help="picks the sample client the statements use")
+    ap.add_argument("--only", nargs="*", help="names of the statements to run")
+    ap.add_argument("--out", type=Path, help="write results as JSON (e.g. a new baseline)")
+    ap.add_argument("--baseline", type=Path, help="compare with a previous --out file")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor")
+    ap.add_argument("--min-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        sys.exit(f"Database not found: {args.db}")
+    conn = sqlite3.connect(str(args.db), isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON")
+    sample = _sample(conn, random.Random(args.seed))
+
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+              for t in ("Client", "memberships", "entries")}
+    result = {
+        "meta": {
+            "sqlite": sqlite3.sqlite_version,
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "repeat": args.repeat,
+            "rows": counts,
+        },
+        "queries": {},
+    }
+    print(f"{'statement':<28}{'median ms':>11}{'p95 ms':>10}{'rows':>8}")
+    for name, bench in _benches(sample).items():
+        if args.only and name not in args.only:
+            continue
+        r = _time(conn, bench, sample, args.repeat)
+        result["queries"][name] = r
+        print(f"{name:<28}{r['median_ms']:>11.3f}{r['p95_ms']:>10.3f}{r['rows']:>8}")
+    conn.close()
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if args.baseline:
+        problems = _compare(result, json.loads(args.baseline.read_text(encoding="utf-8")),
+                            args.tolerance, args.min_ms)
+        for p in problems:
+            print("REGRESSION", p)
+        if problems:
+            sys.exit(1)
+        print("No regressions against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
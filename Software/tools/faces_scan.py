@@ -0,0 +1,359 @@
+# tools/faces_scan.py
+"""
+Reconcile the picture folders with gym.db, and reclaim space.
+
+    python -m tools.faces_scan --app-dir "C:/Users/me/Documents/GymSoftware"
+    python -m tools.faces_scan --app-dir ... --reclaim --inbox-days 7
+
+Walks faces/ (the store shards and older flat pictures), faces/oldFaces and
+the images in phone_inbox (PhoneSync's manifest.json is left alone), and
+hashes and validates every file on a process pool. Reports
+
+    missing     paths the database uses (Client.picture, picture_history,
+                picture_sizes, face_blobs) with no file behind them
+    corrupt     files that are not a whole JPEG / PNG / BMP, and store files
+                whose content no longer matches their hash name
+    orphaned    files in faces/ nothing in the database points at (failed
+                inserts, leftover .tmp files, sizes of deleted pictures)
+    unused      store pictures no client and no picture_history row uses
+    duplicates  identical files under different names
+    refcounts   face_blobs rows whose refcount is out of step
+
+and what oldFaces and phone_inbox hold. Nothing changes without --reclaim,
+which deletes orphaned files and unused store pictures (with their rows)
+older than --min-age minutes, phone_inbox captures older than --inbox-days,
+oldFaces files older than --old-days (only if given), and recounts
+refcounts. A file the database uses is never deleted, even when corrupt:
+paths are compared resolved, orphans are checked against the database again
+inside the reclaim transaction, and --reclaim refuses to run when none of
+the database's pictures is under --app-dir. Best run with the app closed.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from database.migrations import migrate
+
+_CHUNK = 1 << 20
+_TAIL = 64 * 1024          # an EOI marker may be followed by a camera trailer
+_HASH_NAME = re.compile(r"^[0-9a-f]{64}$")
+_INLINE_BELOW = 200        # a pool costs more than it saves on a handful of files
+_INBOX_IMAGES = (".jpg", ".jpeg", ".png", ".bmp")   # not PhoneSync's manifest.json, .tmp or .part files
+
+
+@dataclass
+class FileInfo:
+    path: str
+    size: int
+    mtime: float
+    sha256: str | None
+    error: str = ""        # why the file is not a usable image; "" if it is
+
+
+@dataclass
+class Report:
+    files: dict[str, int] = field(default_factory=dict)            # area -> count
+    bytes: dict[str, int] = field(default_factory=dict)            # area -> total size
+    missing: dict[str, list[str]] = field(default_factory=dict)    # reference -> paths
+    corrupt: list[tuple[str, str]] = field(default_factory=list)   # (path, reason)
+    orphaned: list[str] = field(default_factory=list)
+    unused: list[str] = field(default_factory=list)                # store picture paths
+    duplicates: list[list[str]] = field(default_factory=list)
+    duplicate_bytes: int = 0
+    refcounts: list[tuple[str, int, int]] = field(default_factory=list)   # (hash, stored, actual)
+    referenced: int = 0          # distinct paths the database uses
+    referenced_here: int = 0     # ... of which under the scanned faces/ (0 of many: wrong --app-dir)
+    seconds: float = 0.0
+
+
+# ---------------- Files ----------------
+def _image_error(head: bytes, tail: bytes, size: int) -> str:
+    if size == 0:
+        return "empty file"
+    if head.startswith(b"\xff\xd8\xff"):
+        ok = tail.rstrip(b"\x00").endswith(b"\xff\xd9") or b"\xff\xd9" in tail
+        return "" if ok else "truncated JPEG"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "" if b"IEND" in tail[-16:] else "truncated PNG"
+    if head.startswith(b"BM") and len(head) >= 6:
+        return "" if int.from_bytes(head[2:6], "little") <= size else "truncated BMP"
+    return "not an image"
+
+
+def _check(job: tuple[str, bool]) -> FileInfo:
+    """Stat, validate and (optionally) hash one file. Runs in a worker process."""
+    path, do_hash = job
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            if do_hash:
+                h, head, tail = hashlib.sha256(), b"", b""
+                while chunk := f.read(_CHUNK):
+                    head = head or chunk[:16]
+                    h.update(chunk)
+                    tail = chunk[-_TAIL:] if len(chunk) >= _TAIL else (tail + chunk)[-_TAIL:]
+                digest = h.hexdigest()
+            else:
+                head = f.read(16)
+                f.seek(max(0, st.st_size - _TAIL))
+                tail, digest = f.read(), None
+    except OSError as e:
+        return FileInfo(path, 0, 0.0, None, f"unreadable: {e.strerror or e}")
+    return FileInfo(path, st.st_size, st.st_mtime, digest, _image_error(head, tail, st.st_size))
+
+
+def _walk(root: Path, skip: tuple[Path, ...] = ()) -> list[str]:
+    """Files under root, as resolved paths (so _key() of them is just normcase)."""
+    skipped = {_key(p) for p in skip}
+    out, stack = [], [os.path.realpath(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if os.path.normcase(e.path) not in skipped:
+                        stack.append(e.path)
+                elif e.is_file(follow_symlinks=False):
+                    out.append(e.path)
+    return out
+
+
+def _inbox(app_dir: Path) -> list[str]:
+    return [p for p in _walk(app_dir / "phone_inbox") if p.lower().endswith(_INBOX_IMAGES)]
+
+
+def _check_all(paths: list[str], do_hash: bool, workers: int) -> list[FileInfo]:
+    jobs = [(p, do_hash) for p in paths]
+    if len(jobs) < _INLINE_BELOW or workers <= 1:
+        return [_check(j) for j in jobs]
+    chunksize = max(16, min(512, len(jobs) // (workers * 8)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_check, jobs, chunksize=chunksize))
+
+
+def _key(path: str | Path) -> str:
+    """
+    Comparable form of a path: resolved (symlinks, redirected folders, ~
+    spelled differently all end up the same) and case-folded where the file
+    system is. Folders are resolved once each.
+    """
+    head, tail = os.path.split(os.path.abspath(path))
+    return os.path.normcase(os.path.join(_real_dir(head), tail))
+
+
+_REAL_DIRS: dict[str, str] = {}
+
+
+def _real_dir(folder: str) -> str:
+    real = _REAL_DIRS.get(folder)
+    if real is None:
+        real = _REAL_DIRS[folder] = os.path.realpath(folder)
+    return real
+
+
+def _used_keys(conn: sqlite3.Connection) -> set[str]:
+    return {_key(p) for paths in _references(conn).values() for p in paths}
+
+
+# ---------------- Database ----------------
+_REFERENCES = {
+    "Client.picture": "SELECT picture FROM Client WHERE picture IS NOT NULL AND picture <> ''",
+    "picture_history": "SELECT picture FROM picture_history",
+    "picture_sizes": "SELECT path FROM picture_sizes",
+    "face_blobs": "SELECT path FROM face_blobs",
+}
+_USES = ("(SELECT COUNT(*) FROM Client c WHERE c.picture = b.path)"
+         " + (SELECT COUNT(*) FROM picture_history h WHERE h.picture = b.path)")
+_BLOB_COUNTS_SQL = f"SELECT hash, path, refcount, {_USES} FROM face_blobs b"
+_DELETE_UNUSED_BLOB_SQL = f"DELETE FROM face_blobs AS b WHERE path = ? AND {_USES} = 0"
+_FIX_REFCOUNTS_SQL = f"UPDATE face_blobs AS b SET refcount = {_USES} WHERE refcount <> {_USES}"
+
+
+def _references(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    return {name: [r[0] for r in conn.execute(sql)] for name, sql in _REFERENCES.items()}
+
+
+# ---------------- Scan ----------------
+def scan(conn: sqlite3.Connection, app_dir: Path, do_hash: bool = True, workers: int = 0) -> Report:
+    started = time.perf_counter()
+    faces, old = app_dir / "faces", app_dir / "faces" / "oldFaces"
+    areas = {"faces": _walk(faces, skip=(old,)), "oldFaces": _walk(old), "phone_inbox": _inbox(app_dir)}
+    infos = _check_all([p for paths in areas.values() for p in paths], do_hash, workers or os.cpu_count() or 1)
+    scanned = {os.path.normcase(i.path) for i in infos}
+
+    report = Report()
+    start = 0
+    for area, paths in areas.items():
+        report.files[area] = len(paths)
+        report.bytes[area] = sum(i.size for i in infos[start:start + len(paths)])
+        start += len(paths)
+
+    refs = {name: [(p, _key(p)) for p in paths] for name, paths in _references(conn).items()}
+    used = {k for pairs in refs.values() for _, k in pairs}
+    for name, pairs in refs.items():
+        gone = [p for p, k in pairs if k not in scanned and not os.path.exists(p)]
+        if gone:
+            report.missing[name] = gone
+
+    for info in infos:
+        if info.error:
+            report.corrupt.append((info.path, info.error))
+        elif info.sha256 and _HASH_NAME.match(Path(info.path).stem) and Path(info.path).stem != info.sha256:
+            report.corrupt.append((info.path, "content does not match its hash name"))
+    report.orphaned = [p for p in areas["faces"] if os.path.normcase(p) not in used]
+    faces_key = os.path.join(os.path.normcase(os.path.realpath(faces)), "")
+    report.referenced = len(used)
+    report.referenced_here = sum(1 for k in used if k.startswith(faces_key))
+
+    for blob_hash, path, stored, actual in conn.execute(_BLOB_COUNTS_SQL):
+        if stored != actual:
+            report.refcounts.append((blob_hash, stored, actual))
+        if actual == 0:
+            report.unused.append(path)
+
+    groups = defaultdict(list)
+    for info in infos:
+        if info.sha256 and not info.error:
+            groups[info.sha256].append(info)
+    for same in groups.values():
+        if len(same) > 1:
+            report.duplicates.append([i.path for i in same])
+            report.duplicate_bytes += same[0].size * (len(same) - 1)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+# ---------------- Reclaim ----------------
+def reclaim(conn: sqlite3.Connection, report: Report, app_dir: Path, min_age_s: float,
+            inbox_days: float | None, old_days: float | None) -> tuple[int, int]:
+    """Delete what the report found reclaimable. Returns (files, bytes) removed."""
+    if report.referenced and not report.referenced_here:
+        # every picture would look orphaned: app_dir is not where the database's pictures are
+        raise RuntimeError(f"None of the {report.referenced:,} pictures the database uses is under "
+                           f"{app_dir / 'faces'}; wrong --app-dir? Nothing was deleted.")
+    now = time.time()
+
+    def old_enough(path: str, age_s: float) -> bool:
+        try:
+            return now - os.stat(path).st_mtime >= age_s
+        except OSError:
+            return False
+
+    orphans = [p for p in report.orphaned if old_enough(p, min_age_s)]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # re-checked here, like unused below: a client may have been given the file since the scan
+        used = _used_keys(conn)
+        doomed = [p for p in orphans if _key(p) not in used]
+        conn.execute(_FIX_REFCOUNTS_SQL)
+        for path in report.unused:
+            if not old_enough(path, min_age_s):
+                continue
+            # re-checked here: a client may have been given the picture since the scan
+            if conn.execute(_DELETE_UNUSED_BLOB_SQL, (path,)).rowcount != 1:
+                continue
+            sizes = [r[0] for r in conn.execute("SELECT path FROM picture_sizes WHERE picture = ?", (path,))]
+            conn.execute("DELETE FROM picture_sizes WHERE picture = ?", (path,))
+            doomed += [path, *sizes]
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+    if inbox_days is not None:
+        doomed += [p for p in _inbox(app_dir) if old_enough(p, inbox_days * 86400)]
+    if old_days is not None:
+        doomed += [p for p in _walk(app_dir / "faces" / "oldFaces") if old_enough(p, old_days * 86400)]
+
+    files = size = 0
+    for path in dict.fromkeys(doomed):
+        try:
+            n = os.stat(path).st_size
+            os.remove(path)
+        except OSError:
+            continue
+        files, size = files + 1, size + n
+    return files, size
+
+
+# ---------------- Output ----------------
+def _mb(n: int) -> str:
+    return f"{n / 1e6:,.1f} MB"
+
+
+def _print_report(report: Report, show: int) -> None:
+    total = sum(report.files.values())
+    print(f"Scanned {total:,} files in {report.seconds:.1f}s "
+          f"({total / max(report.seconds, 1e-9):,.0f} files/s)")
+    for area, n in report.files.items():
+        print(f"  {area:<12}{n:>9,} files {_mb(report.bytes[area]):>12}")
+
+    def section(title: str, rows: list[str]) -> None:
+        print(f"{title}: {len(rows):,}")
+        for row in rows[:show]:
+            print("   ", row)
+        if len(rows) > show:
+            print(f"    … {len(rows) - show:,} more")
+
+    for name, paths in report.missing.items():
+        section(f"missing ({name})", paths)
+    if not report.missing:
+        print("missing: 0")
+    section("corrupt", [f"{p}  [{why}]" for p, why in report.corrupt])
+    section("orphaned", report.orphaned)
+    section("unused store pictures", report.unused)
+    section("refcounts out of step", [f"{h[:12]}… stored {s}, actual {a}" for h, s, a in report.refcounts])
+    print(f"duplicates: {len(report.duplicates):,} groups, {_mb(report.duplicate_bytes)} reclaimable by dedup")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--app-dir", type=Path, required=True, help="the GymSoftware folder (faces/, phone_inbox/)")
+    ap.add_argument("--db", type=Path, help="database file (default: APP_DIR/gym.db)")
+    ap.add_argument("--workers", type=int, default=0, help="processes (default: one per CPU)")
+    ap.add_argument("--no-hash", action="store_true", help="validate headers / trailers only (faster)")
+    ap.add_argument("--show", type=int, default=10, help="paths listed per category")
+    ap.add_argument("--json", type=Path, help="write the full report as JSON")
+    ap.add_argument("--reclaim", action="store_true", help="delete what is safe to delete")
+    ap.add_argument("--min-age", type=float, default=60, help="minutes before an orphan may be deleted")
+    ap.add_argument("--inbox-days", type=float, default=7, help="phone_inbox captures kept this long")
+    ap.add_argument("--old-days", type=float, help="also delete oldFaces files older than this")
+    args = ap.parse_args()
+
+    db_path = args.db or args.app_dir / "gym.db"
+    if not db_path.exists():
+        sys.exit(f"Database not found: {db_path}")
+    migrate(db_path)   # the store tables exist from schema 9 on
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+
+    report = scan(conn, args.app_dir, not args.no_hash, args.workers)
+    _print_report(report, args.show)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(asdict(report), indent=2), encoding="utf-8")
+    if args.reclaim:
+        try:
+            files, size = reclaim(conn, report, args.app_dir, args.min_age * 60, args.inbox_days, args.old_days)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        print(f"Reclaimed {files:,} files, {_mb(size)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# tools/fake_adb.py
+"""
+A scriptable stand-in for the adb executable, for exercising the phone
+capture flow without a phone.
+
+Point ADB_PATH at a launcher that runs `python -m tools.fake_adb "$@"` (see
+tools/bench_capture.py, which writes one). The phone's storage is a local
+folder: /sdcard/... maps to $FAKE_ADB_PHONE/sdcard/...
+
+Emulated, the way clientsManagement/phone_capture.py uses them:
+
+    version, get-state
+    shell "[ -d DIR ] && echo OK || echo NO"
+    shell "ls -1t DIR/*.jpg"
+    shell <watch script>      the AdbWatch session, in its polling mode
+    shell <stat listing>      PhoneSync's "size mtime name" listing
+    exec-out "cat FILE"       FILE quoted for the shell (shlex.quote)
+    pull REMOTE LOCAL
+
+Everything runs inside this one process, so killing it (as QProcess.kill()
+does) ends the whole "session", like unplugging does on a real phone.
+
+Behaviour is set by environment variables, or by the same keys (lower case,
+without the prefix) in $FAKE_ADB_PHONE/.fake_adb.json, which is re-read on
+every call and while a watch runs, so a test can unplug the phone mid-run:
+
+    FAKE_ADB_PHONE      the phone folder (required)
+    FAKE_ADB_LATENCY    seconds before each command answers (default 0)
+    FAKE_ADB_BPS        transfer speed for cat / pull in bytes/s (default: unlimited)
+    FAKE_ADB_STATE      device | offline | unauthorized | none (default device)
+    FAKE_ADB_FAIL       commands that fail, e.g. "get-state,exec-out"
+    FAKE_ADB_FAIL_RATE  chance (0..1) that any command fails
+    FAKE_ADB_LOG        file that gets one line per adb process started
+"""
+from __future__ import annotations
+import json
+import os
+import random
+import re
+import shlex
+import sys
+import time
+from pathlib import Path
+
+_CONFIG_FILE = ".fake_adb.json"
+_NO_DEVICE = "error: no devices/emulators found"
+
+
+def _config() -> dict:
+    cfg = {k[len("FAKE_ADB_"):].lower(): v for k, v in os.environ.items() if k.startswith("FAKE_ADB_")}
+    try:
+        cfg.update(json.loads((Path(cfg["phone"]) / _CONFIG_FILE).read_text(encoding="utf-8")))
+    except (KeyError, OSError, ValueError):
+        pass
+    return cfg
+
+
+class _Phone:
+    def __init__(self, cfg: dict):
+        self.root = Path(cfg["phone"])
+
+    def local(self, remote: str) -> Path:
+        return self.root / remote.lstrip("/")
+
+    def photos(self, remote_dir: str, suffixes=(".jpg",)) -> list[Path]:
+        folder = self.local(remote_dir)
+        try:
+            files = [p for p in folder.iterdir() if p.suffix.lower() in suffixes and p.is_file()]
+        except OSError:
+            return []
+        return sorted(files, key=lambda p: p.stat().st_mtime_ns, reverse=True)
+
+
+def _fail(msg: str, code: int = 1) -> int:
+    print(msg, file=sys.stderr)
+    return code
+
+
+def _device_error(cfg: dict) -> str:
+    state = cfg.get("state", "device")
+    if state == "none":
+        return _NO_DEVICE
+    if state != "device":
+        return f"error: device {state}"
+    return ""
+
+
+def _send(data: bytes, cfg: dict) -> None:
+    bps = float(cfg.get("bps") or 0)
+    out = sys.stdout.buffer
+    step = 256 * 1024
+    for i in range(0, len(data), step):
+        out.write(data[i:i + step])
+        if bps:
+            time.sleep(min(step, len(data) - i) / bps)
+    out.flush()
+
+
+# ---------------- Shell ----------------
+def _watch(phone: _Phone, script: str, remote_dir: str) -> int:
+    """The AdbWatch script in polling mode (no inotifyd on the fake)."""
+    m = re.search(r"loop ([\d.]+); fi", script)
+    interval = float(m.group(1)) if m else 0.3
+    folder = phone.local(remote_dir)
+    if not folder.is_dir():
+        print("E nofolder", flush=True)
+        return 3
+
+    def newest() -> str:
+        photos = phone.photos(remote_dir, (".jpg", ".jpeg"))
+        return photos[0].name if photos else ""
+
+    def stat(path: Path, attr: str):
+        try:
+            return getattr(path.stat(), attr)
+        except OSError:
+            return None
+
+    last = newest()
+    print(f"B {last}", flush=True)
+    print("M poll", flush=True)
+    # like the script: ls -t only when the folder changed; report a name once its size held for a tick
+    mtime, name, size = None, last, None
+    while True:
+        time.sleep(interval)
+        if _device_error(_config()):
+            return _fail(_NO_DEVICE, 255)   # unplugged
+        t = stat(folder, "st_mtime_ns")
+        if t != mtime:
+            mtime, name, size = t, newest(), None
+        if not name or name == last:
+            continue
+        z = stat(folder / name, "st_size")
+        if z is not None and z == size:
+            print(f"N {name}", flush=True)
+            last = name
+        size = z
+
+
+def _shell(phone: _Phone, cmd: str) -> int:
+    m = re.match(r"d='([^']*)'; newest\(\)", cmd)
+    if m:
+        return _watch(phone, cmd, m.group(1))
+    m = re.match(r"\[ -d '([^']*)' \]", cmd)
+    if m:
+        print("OK" if phone.local(m.group(1)).is_dir() else "NO")
+        return 0
+    m = re.match(r"ls -1t (\S+)/\*\.jpg", cmd)
+    if m:
+        photos = phone.photos(m.group(1))
+        for p in photos:
+            print(f"{m.group(1)}/{p.name}")
+        return 0 if photos else 1
+    m = re.match(r"cd '([^']*)' .*stat -c '%s %Y %n'", cmd)
+    if m:
+        for p in reversed(phone.photos(m.group(1), (".jpg", ".jpeg"))):
+            st = p.stat()
+            print(f"{st.st_size} {int(st.st_mtime)} {p.name}")
+        return 0
+    return _fail(f"fake adb: unsupported shell command: {cmd[:60]}", 127)
+
+
+# ---------------- Commands ----------------
+def main(argv: list[str]) -> int:
+    cfg = _config()
+    if "log" in cfg:
+        with open(cfg["log"], "a", encoding="utf-8") as log:
+            log.write(f"{time.time():.3f} {' '.join(argv)[:80]}\n")
+    if not argv:
+        return _fail("fake adb: no command")
+    time.sleep(float(cfg.get("latency") or 0))
+
+    cmd, args = argv[0], argv[1:]
+    if cmd == "version":
+        print("Android Debug Bridge version 1.0.41 (fake)")
+        return 0
+    if cmd in (cfg.get("fail") or "").split(",") or random.random() < float(cfg.get("fail_rate") or 0):
+        return _fail(_NO_DEVICE)
+    if cmd == "get-state":
+        err = _device_error(cfg)
+        if err:
+            return _fail(err)
+        print("device")
+        return 0
+    err = _device_error(cfg)
+    if err:
+        return _fail(err)
+
+    phone = _Phone(cfg)
+    if cmd == "shell" and args:
+        return _shell(phone, " ".join(args))
+    if cmd == "exec-out" and args:
+        try:
+            words = shlex.split(" ".join(args))
+        except ValueError:
+            words = []
+        if len(words) != 2 or words[0] != "cat":
+            return _fail("fake adb: unsupported exec-out command", 127)
+        try:
+            _send(phone.local(words[1]).read_bytes(), cfg)
+        except OSError as e:
+            sys.stdout.write(f"cat: {words[1]}: {e.strerror}\n")   # exec-out mixes it into the data
+        return 0
+    if cmd == "pull" and len(args) == 2:
+        try:
+            data = phone.local(args[0]).read_bytes()
+        except OSError as e:
+            return _fail(f"adb: error: failed to stat remote object '{args[0]}': {e.strerror}")
+        Path(args[1]).write_bytes(data)
+        print(f"{args[0]}: 1 file pulled.")
+        return 0
+    return _fail(f"fake adb: unsupported command: {' '.join(argv)[:60]}", 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+# tools/generate_data.py
+"""
+Fill a gym.db with synthetic data at production scale.
+
+The schema comes from database/migrations.py, i.e. exactly what the app and
+InitializeGymData create. Run from the Software folder:
+
+    python -m tools.generate_data --db bench/gym.db --clients 200000 \
+        --memberships 1000000 --entries 20000000
+"""
+from __future__ import annotations
+import argparse
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from database.migrations import migrate
+
+PLANS = [("Monthly", 1, 3000), ("Quarterly", 3, 8000), ("Half year", 6, 15000), ("Yearly", 12, 27000)]
+PLAN_WEIGHTS = [60, 20, 12, 8]
+ROLES = ["client", "coach", "owner"]
+ROLE_WEIGHTS = [975, 24, 1]
+
+FIRST = ["Ali", "Amine", "Sara", "Yasmine", "Mohamed", "Ines", "Omar", "Lina", "Youssef", "Nour",
+         "Karim", "Salma", "Hamza", "Meriem", "Walid", "Rania", "Aziz", "Emna", "Fares", "Hiba"]
+LAST = ["Ben Ali", "Trabelsi", "Gharbi", "Jaziri", "Mansour", "Haddad", "Bouazizi", "Chebbi",
+        "Khelifi", "Sassi", "Mejri", "Ayari", "Hammami", "Dridi", "Zouari", "Ferchichi"]
+
+BATCH = 50_000
+
+
+def _add_months(d: date, months: int) -> date:
+    y, m = divmod(d.month - 1 + months, 12)
+    y += d.year
+    m += 1
+    for day in (d.day, 30, 29, 28):
+        try:
+            return date(y, m, day)
+        except ValueError:
+            continue
+    raise ValueError(d)
+
+
+def _flush(conn: sqlite3.Connection, sql: str, rows: list) -> None:
+    if rows:
+        conn.executemany(sql, rows)
+        rows.clear()
+
+
+def generate(db_path: Path, clients: int, memberships: int, entries: int, years: int, seed: int) -> None:
+    rng = random.Random(seed)
+    today = date.today()
+    first_day = today - timedelta(days=365 * years)
+    span = (today - first_day).days
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    migrate(db_path)
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("BEGIN")
+
+    conn.executemany("INSERT INTO membership_plans (name, months, price_decimal) VALUES (?, ?, ?)", PLANS)
+    plan_ids = [r[0] for r in conn.execute("SELECT id FROM membership_plans ORDER BY id DESC LIMIT 4")][::-1]
+
+    start_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Client").fetchone()[0] + 1
+    card_base = conn.execute("SELECT COALESCE(MAX(id_card), 10000000) FROM Client").fetchone()[0] + 1
+
+    # memberships / entries per client: Poisson-ish around the requested averages
+    per_client = memberships / max(clients, 1)
+    per_membership = entries / max(memberships, 1)
+
+    client_rows, membership_rows, entry_rows = [], [], []
+    n_members = n_entries = 0
+    started = time.perf_counter()
+    for i in range(clients):
+        client_id = start_id + i
+        created = first_day + timedelta(days=rng.randrange(span))
+        phone = "0" + "".join(rng.choice("0123456789") for _ in range(8))
+        card = str(card_base + i)
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+        client_rows.append((
+            client_id, name, int(card), card, int(phone), phone,
+            rng.choices(ROLES, ROLE_WEIGHTS)[0],
+            f"faces/{name.replace(' ', '_')}_{card}.jpg",
+            f"{created.isoformat()} {rng.randrange(8, 22):02d}:{rng.randrange(60):02d}:00",
+        ))
+
+        # back-to-back memberships with random gaps, starting around the sign-up date
+        start = created + timedelta(days=rng.randrange(15))
+        for _ in range(max(0, round(rng.expovariate(1 / per_client)) if per_client else 0)):
+            if start > today + timedelta(days=30):
+                break
+            plan = rng.choices(range(len(PLANS)), PLAN_WEIGHTS)[0]
+            _, months, price = PLANS[plan]
+            end = _add_months(start, months)
+            membership_rows.append((client_id, plan_ids[plan], start.isoformat(), end.isoformat(), price))
+            n_members += 1
+
+            visit_days = max(0, (min(end, today) - start).days)
+            for _ in range(round(rng.expovariate(1 / per_membership)) if per_membership and visit_days else 0):
+                day = start + timedelta(days=rng.randrange(visit_days))
+                entry_rows.append((f"{day.isoformat()} {rng.randrange(6, 23):02d}:{rng.randrange(60):02d}:"
+                                   f"{rng.randrange(60):02d}", client_id))
+                n_entries += 1
+            start = end + timedelta(days=rng.choice((0, 0, 0, 7, 30, 90)))
+
+        if len(client_rows) >= BATCH or len(entry_rows) >= BATCH * 4:
+            _flush(conn, """
+                INSERT INTO Client (id, full_name, id_card, id_card_text, phone_number, phone_text,
+                                    role, picture, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", client_rows)
+            _flush(conn, """
+                INSERT INTO memberships (client_id, plan_id, start_date, end_date, price_paid)
+                VALUES (?, ?, ?, ?, ?)""", membership_rows)
+            _flush(conn, "INSERT INTO entries (date, person_id) VALUES (?, ?)", entry_rows)
+            print(f"  {i + 1:>9,} clients  {n_members:>11,} memberships  {n_entries:>12,} entries"
+                  f"  ({time.perf_counter() - started:.0f}s)", flush=True)
+
+    _flush(conn, """
+        INSERT INTO Client (id, full_name, id_card, id_card_text, phone_number, phone_text,
+                            role, picture, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", client_rows)
+    _flush(conn, """
+        INSERT INTO memberships (client_id, plan_id, start_date, end_date, price_paid)
+        VALUES (?, ?, ?, ?, ?)""", membership_rows)
+    _flush(conn, "INSERT INTO entries (date, person_id) VALUES (?, ?)", entry_rows)
+    conn.execute("COMMIT")
+
+    conn.execute("ANALYZE")   # planner statistics, as a long-used database would have
+    conn.close()
+    print(f"Done in {time.perf_counter() - started:.0f}s: {clients:,} clients, {n_members:,} memberships, "
+          f"{n_entries:,} entries -> {db_path} ({datetime.now():%H:%M:%S})")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", type=Path, required=True, help="database file (created or appended to)")
+    ap.add_argument("--clients", type=int, default=200_000)
+    ap.add_argument("--memberships", type=int, default=1_000_000, help="approximate total")
+    ap.add_argument("--entries", type=int, default=20_000_000, help="approximate total")
+    ap.add_argument("--years", type=int, default=5, help="history spread of sign-ups and visits")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    generate(args.db, args.clients, args.memberships, args.entries, args.years, args.seed)
+
+
+if __name__ == "__main__":
+    main()